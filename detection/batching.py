@@ -0,0 +1,129 @@
+"""
+Batched inference across streams: the newest frame of every engine is
+gathered each tick and sent to YOLO in one call
+"""
+
+import threading
+import time
+
+from .engine import Decision
+from .metrics import metrics
+
+
+class BatchInference:
+    """Tick-based batching worker shared by several DetectionEngines
+    
+    submit() keeps only the newest frame per engine. Each tick, prepared jobs
+    are grouped by input size and run in one model call per group. The
+    second half of each step (decision, sinks) runs on `executor` when given,
+    so per-stream post-processing does not serialize behind the batch.
+    """
+    
+    def __init__(self, model, interval=1 / 30, max_batch=16, executor=None):
+        self.model = model
+        self.interval = interval
+        self.max_batch = max_batch
+        self.executor = executor
+        self.pending = {}       # engine -> (frame, seq, captured_at)
+        self.inflight = {}      # engine -> future of its last completion
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.batches = 0
+        self.batched_frames = 0
+        self.dropped = 0
+    
+    def submit(self, engine, frame, seq=0, captured_at=None):
+        """Queue the newest frame of a stream, replacing any frame not yet batched"""
+        if captured_at is None:
+            captured_at = time.monotonic()
+        with self.cond:
+            if engine in self.pending:
+                self.dropped += 1
+            self.pending[engine] = (frame, seq, captured_at)
+            self.cond.notify()
+    
+    def remove(self, engine):
+        with self.cond:
+            self.pending.pop(engine, None)
+            self.inflight.pop(engine, None)
+    
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+    
+    def _take(self):
+        """Pending frames of engines whose previous step has finished"""
+        items = []
+        for engine in list(self.pending):
+            future = self.inflight.get(engine)
+            if future is not None and not future.done():
+                continue    # keep the frame for the next tick, steps of one engine stay ordered
+            items.append((engine,) + self.pending.pop(engine))
+        return items
+    
+    def _run(self):
+        next_tick = time.perf_counter()
+        while self.running:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or not self.running, timeout=0.5)
+            if not self.running:
+                break
+            
+            # Let frames from other streams arrive until the tick boundary
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_tick = max(next_tick + self.interval, time.perf_counter())
+            
+            with self.cond:
+                items = self._take()
+            if items:
+                self.run_batch(items)
+    
+    def run_batch(self, items):
+        """Prepare, infer in batches grouped by (imgsz, conf), then complete each step"""
+        groups = {}
+        for engine, frame, seq, captured_at in items:
+            job = engine.schedule(frame, seq, captured_at)
+            if isinstance(job, Decision):
+                # YOLO skipped: the sinks of idle streams must not hold up the batch either
+                self._dispatch(engine, engine.publish, job, frame)
+            else:
+                groups.setdefault((job.imgsz, engine.conf), []).append((engine, job, frame))
+        
+        for (imgsz, conf), entries in groups.items():
+            for start in range(0, len(entries), self.max_batch):
+                chunk = entries[start:start + self.max_batch]
+                with metrics.time("yolo_batch"):
+                    results = self.model([job.image for _, job, _ in chunk], conf=conf, imgsz=imgsz, verbose=False)
+                self.batches += 1
+                self.batched_frames += len(chunk)
+                
+                for (engine, job, frame), result in zip(chunk, results):
+                    self._dispatch(engine, engine.complete, job, [result], frame)
+    
+    def _dispatch(self, engine, step, *args):
+        """Run the end of a step inline, or on the executor (tracked to keep each engine in order)"""
+        if self.executor is None:
+            step(*args)
+            return
+        future = self.executor.submit(step, *args)
+        with self.cond:
+            self.inflight[engine] = future
+    
+    def get_stats(self):
+        with self.cond:
+            return {
+                "batches": self.batches,
+                "mean_batch": self.batched_frames / self.batches if self.batches else 0.0,
+                "dropped_frames": self.dropped,
+            }
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Detection benchmark on recorded sessions
+Records webcam sessions, then replays them through the detection pipeline of
+each backend and compares throughput, per-stage latency and decisions
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detection.engine import DetectionEngine
+from detection.models import BACKENDS, available_backends, find_latest_model, select_model
+from detection.roi import RoiTracker
+from detection.scheduler import AdaptiveScheduler
+from detection.smoothing import DecisionFilter
+from detection.sources import CameraSource, ReplaySource
+
+
+def record(path, seconds, device=0):
+    """Record `seconds` of webcam frames to `path`"""
+    source = CameraSource(device=device, width=640, height=480, fps=30)
+    if not source.start():
+        return False
+    source.start_recording(path)
+    print(f"Recording {seconds}s to {path}...")
+    time.sleep(seconds)
+    source.stop()
+    return True
+
+
+def make_engine(model, imgsz, plain):
+    """Same pipeline as the game, or bare YOLO + decision with `plain`"""
+    if plain:
+        return DetectionEngine(model, imgsz=imgsz, invert_x=True)
+    return DetectionEngine(model, imgsz=imgsz, conf=0.25, invert_x=True,
+                           scheduler=AdaptiveScheduler(min_interval=1, max_interval=6),
+                           roi_tracker=RoiTracker(imgsz=160),
+                           decision_filter=DecisionFilter(window=4))
+
+
+def run_recording(engine, path):
+    """Replay one recording at max speed; return per-frame decisions and stage timings (ms)"""
+    source = ReplaySource(path, realtime=False)
+    source.start()
+    decisions = []
+    stages = {"prepare": [], "infer": [], "complete": [], "total": []}
+    
+    start = time.perf_counter()
+    while True:
+        item = source.acquire()
+        if item is None:
+            break
+        seq, frame, captured_at = item
+        
+        t0 = time.perf_counter()
+        job = engine.prepare(frame, seq, captured_at)
+        t1 = time.perf_counter()
+        if job is None:
+            decision = engine.get_decision()
+            t2 = t3 = t1
+        else:
+            results = engine.infer(job.image, job.imgsz)
+            t2 = time.perf_counter()
+            decision = engine.complete(job, results, frame)
+            t3 = time.perf_counter()
+            stages["infer"].append((t2 - t1) * 1000)
+            stages["complete"].append((t3 - t2) * 1000)
+        stages["prepare"].append((t1 - t0) * 1000)
+        stages["total"].append((t3 - t0) * 1000)
+        decisions.append((decision.direction, decision.action))
+        source.release()
+    elapsed = time.perf_counter() - start
+    source.stop()
+    return decisions, stages, elapsed
+
+
+def agreement(reference, decisions):
+    """Share of frames with the same direction, the same action, and both"""
+    pairs = list(zip(reference, decisions))
+    if not pairs:
+        return 0.0, 0.0, 0.0
+    direction = sum(a[0] == b[0] for a, b in pairs) / len(pairs)
+    action = sum(a[1] == b[1] for a, b in pairs) / len(pairs)
+    both = sum(a == b for a, b in pairs) / len(pairs)
+    return direction, action, both
+
+
+def print_report(results, reference):
+    print(f"\n{'backend':<10} {'frames':>7} {'FPS':>7} {'YOLO runs':>10}")
+    for backend, (decisions, stages, elapsed) in results.items():
+        print(f"{backend:<10} {len(decisions):>7} {len(decisions) / elapsed:>7.1f} {len(stages['infer']):>10}")
+    
+    print(f"\n{'backend':<10} {'stage':<9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for backend, (_, stages, _) in results.items():
+        for stage, samples in stages.items():
+            if not samples:
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            print(f"{backend:<10} {stage:<9} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+    
+    print(f"\nDecision agreement with {reference}:")
+    print(f"{'backend':<10} {'direction':>10} {'action':>8} {'both':>8}")
+    for backend, (decisions, _, _) in results.items():
+        if backend == reference:
+            continue
+        direction, action, both = agreement(results[reference][0], decisions)
+        print(f"{backend:<10} {direction:>10.1%} {action:>8.1%} {both:>8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record webcam sessions and benchmark detection backends on them")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    rec = commands.add_parser("record", help="record webcam frames")
+    rec.add_argument("path", help="output directory")
+    rec.add_argument("--seconds", type=float, default=30)
+    rec.add_argument("--device", type=int, default=0)
+    
+    run = commands.add_parser("run", help="replay recordings through each backend")
+    run.add_argument("recordings", nargs="+", help="directories written by `record`")
+    run.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=None,
+                     help="backends to compare (default: every installed one); the first is the reference")
+    run.add_argument("--model", type=str, default=None, help="path to best.pt (default: latest run)")
+    run.add_argument("--imgsz", type=int, default=320)
+    run.add_argument("--plain", action="store_true",
+                     help="YOLO on every frame, without scheduler, ROI or smoothing")
+    args = parser.parse_args()
+    
+    if args.command == "record":
+        if not record(args.path, args.seconds, args.device):
+            exit(1)
+        return
+    
+    model_path = Path(args.model) if args.model else find_latest_model()
+    if not model_path or not model_path.exists():
+        print("Error: no model found! Run training first: python training/train.py")
+        exit(1)
+    
+    backends = args.backends or available_backends()
+    results = {}
+    for backend in backends:
+        name, model = select_model(model_path, backend, args.imgsz)
+        if model is None:
+            continue
+        decisions, stages, elapsed = [], {}, 0.0
+        for path in args.recordings:
+            engine = make_engine(model, args.imgsz, args.plain)
+            d, s, e = run_recording(engine, path)
+            decisions += d
+            elapsed += e
+            for stage, samples in s.items():
+                stages.setdefault(stage, []).extend(samples)
+        results[name] = (decisions, stages, elapsed)
+    
+    if not results:
+        print("Error: no backend could be loaded")
+        exit(1)
+    print_report(results, next(iter(results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+YOLO class mapping shared by the game and the webapp
+"""
+
+CLASS_NAMES = {
+    0: "visage_serieux",   # serious face
+    1: "livre_droite",     # book right
+    2: "livre_milieu",     # book center
+    3: "livre_gauche",     # book left
+    4: "visage_sourire"    # smiling face
+}
+
+NUM_CLASSES = len(CLASS_NAMES)
+
+# Class groups
+BOOK_CLASSES = (1, 2, 3)
+FACE_CLASSES = (0, 4)
+
+# Direction given by each book class (camera image, not mirrored)
+BOOK_DIRECTIONS = {
+    1: "DROITE",   # right
+    2: "MILIEU",   # center
+    3: "GAUCHE",   # left
+}
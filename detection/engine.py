@@ -0,0 +1,342 @@
+"""
+Detection engine shared by the pygame game and the Flask webapp
+Runs YOLO on frames from a pluggable source and publishes direction/action
+decisions to registered sinks
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from .classes import CLASS_NAMES, NUM_CLASSES, BOOK_CLASSES, BOOK_DIRECTIONS
+from .metrics import metrics
+from .scheduler import MotionDetector
+
+MIRRORED = {"GAUCHE": "DROITE", "DROITE": "GAUCHE", "MILIEU": "MILIEU"}
+
+
+class Decision:
+    """Direction and action derived from one frame"""
+    
+    def __init__(self, direction="MILIEU", action="STOP", confidence=0.0,
+                 class_conf=None, detections=None, seq=0, captured_at=0.0, boxes=None):
+        self.direction = direction
+        self.action = action
+        self.confidence = confidence
+        self.class_conf = class_conf or {}    # class id -> max confidence
+        self.detections = detections or []    # (class name, max confidence) per class, best first
+        self.boxes = boxes or {}              # class id -> xyxy of its most confident box
+        self.scores = np.zeros(NUM_CLASSES, dtype=np.float32)           # same as class_conf, by class id
+        self.class_boxes = np.zeros((NUM_CLASSES, 4), dtype=np.float32)  # same as boxes, by class id
+        self.roi = None                       # crop used for inference, None for full frame
+        self.seq = seq
+        self.captured_at = captured_at
+        self.frame_age = 0.0
+        self.motion = 0.0       # inter-frame change measured by the engine
+        self.reused = False     # True when YOLO was skipped and the last result reused
+        
+    def reuse(self, seq, captured_at):
+        """Copy of this decision for a newer frame on which YOLO was skipped"""
+        decision = Decision(self.direction, self.action, self.confidence,
+                            self.class_conf, self.detections, seq, captured_at, self.boxes)
+        decision.scores = self.scores
+        decision.class_boxes = self.class_boxes
+        decision.roi = self.roi
+        decision.reused = True
+        return decision
+
+
+class InferenceJob:
+    """Image (full frame or crop) waiting for YOLO, with the context to finish the step"""
+    
+    def __init__(self, image, imgsz, roi, motion, seq, captured_at):
+        self.image = image
+        self.imgsz = imgsz
+        self.roi = roi
+        self.motion = motion
+        self.seq = seq
+        self.captured_at = captured_at
+
+
+class DetectionEngine:
+    """YOLO detection pipeline with a pluggable frame source and decision sinks
+    
+    A sink is a callable sink(decision, frame) invoked from the inference
+    thread. The frame belongs to the source and is only valid during the call.
+    With a scheduler, YOLO is skipped on static frames and the last decision
+    is republished instead. With a RoiTracker, YOLO runs on a crop around the
+    last detections and falls back to the full frame when confidence drops.
+    With a DecisionFilter, direction and action come from smoothed confidences.
+    """
+    
+    def __init__(self, model, imgsz=320, conf=0.25, invert_x=True, scheduler=None, roi_tracker=None,
+                 decision_filter=None):
+        self.model = model
+        self.imgsz = imgsz
+        self.conf = conf
+        # Invert X controls (mirrored camera)
+        self.invert_x = invert_x
+        self.scheduler = scheduler
+        self.roi_tracker = roi_tracker
+        self.decision_filter = decision_filter
+        self.motion_detector = MotionDetector()
+        
+        self.sinks = []
+        self.source = None
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.last_decision = Decision()
+        self.decisions = 0
+        
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        
+    def infer(self, frame, imgsz=None):
+        """Run YOLO on one frame"""
+        with metrics.time("yolo"):
+            return self.model(frame, conf=self.conf, imgsz=imgsz or self.imgsz, verbose=False)
+        
+    def decide(self, results, offset=(0, 0), frame_width=None):
+        """Reduce YOLO results to per-class max confidence and box, and a decision
+        
+        offset is the top-left corner of the crop the results were computed on.
+        With frame_width (crop results), the book class is taken from the box
+        position in the full frame: a crop does not show where the book is.
+        """
+        start = time.perf_counter()
+        scores, class_boxes = summarize(results)
+        class_boxes[:, 0::2] += offset[0]
+        class_boxes[:, 1::2] += offset[1]
+        if frame_width is not None:
+            relabel_book(scores, class_boxes, frame_width)
+        
+        # Python objects only for the (at most NUM_CLASSES) classes present
+        present = np.flatnonzero(scores).tolist()
+        conf_values = scores.tolist()
+        class_conf = {cls_id: conf_values[cls_id] for cls_id in present}
+        boxes = {cls_id: tuple(class_boxes[cls_id].tolist()) for cls_id in present}
+        detections = sorted(((CLASS_NAMES.get(cls_id, "?"), conf) for cls_id, conf in class_conf.items()),
+                            key=lambda d: d[1], reverse=True)
+        
+        direction, book_conf = decide_direction(class_conf)
+        if self.invert_x:
+            direction = MIRRORED[direction]
+        action, face_conf = decide_action(class_conf)
+        
+        decision = Decision(direction, action, max(book_conf, face_conf), class_conf, detections, boxes=boxes)
+        decision.scores = scores
+        decision.class_boxes = class_boxes
+        metrics.record("postprocess", time.perf_counter() - start)
+        return decision
+        
+    def prepare(self, frame, seq=0, captured_at=None):
+        """First half of a step: motion, scheduling and crop selection
+        
+        Returns the InferenceJob to run, or None when YOLO is skipped (the
+        last decision is then republished right away).
+        """
+        job = self.schedule(frame, seq, captured_at)
+        if isinstance(job, Decision):
+            self.publish(job, frame)
+            return None
+        return job
+        
+    def schedule(self, frame, seq=0, captured_at=None):
+        """prepare() without publishing: the InferenceJob to run, or the reused
+        Decision to publish when YOLO is skipped (the caller picks the thread)"""
+        if captured_at is None:
+            captured_at = time.monotonic()
+        # capture: wait between the camera read and the start of the step
+        metrics.record("capture", time.monotonic() - captured_at)
+        start = time.perf_counter()
+        motion = self.motion_detector.update(frame)
+        
+        if self.scheduler and not self.scheduler.should_run(motion):
+            decision = self.last_decision.reuse(seq, captured_at)
+            decision.motion = motion
+            metrics.record("preprocess", time.perf_counter() - start)
+            return decision
+        
+        roi = self.roi_tracker.next_roi() if self.roi_tracker else None
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            job = InferenceJob(frame[y1:y2, x1:x2], self.roi_tracker.imgsz, roi, motion, seq, captured_at)
+        else:
+            job = InferenceJob(frame, self.imgsz, None, motion, seq, captured_at)
+        metrics.record("preprocess", time.perf_counter() - start)
+        return job
+        
+    def complete(self, job, results, frame):
+        """Second half of a step: decision from the YOLO results of a job, then publish"""
+        roi = job.roi
+        if roi is not None:
+            decision = self.decide(results, roi[:2], frame.shape[1])
+            if not self.roi_tracker.accept(decision):
+                roi = None    # target lost: full-frame search on the same frame
+        if roi is None:
+            if job.roi is not None:
+                results = self.infer(frame)
+            decision = self.decide(results)
+        
+        if self.roi_tracker:
+            self.roi_tracker.update(decision, frame.shape, roi is not None)
+        decision.roi = roi
+        
+        if self.decision_filter:
+            book_class, accelerating = self.decision_filter.update(decision.class_conf)
+            direction = BOOK_DIRECTIONS[book_class] if book_class is not None else "MILIEU"
+            decision.direction = MIRRORED[direction] if self.invert_x else direction
+            decision.action = "ACCELERER" if accelerating else "STOP"
+        
+        decision.seq = job.seq
+        decision.captured_at = job.captured_at
+        decision.motion = job.motion
+        self.publish(decision, frame)
+        return decision
+        
+    def process(self, frame, seq=0, captured_at=None):
+        """Run the full pipeline on one frame and publish the decision"""
+        job = self.prepare(frame, seq, captured_at)
+        if job is None:
+            return self.last_decision
+        return self.complete(job, self.infer(job.image, job.imgsz), frame)
+        
+    def publish(self, decision, frame):
+        decision.frame_age = time.monotonic() - decision.captured_at
+        with self.lock:
+            self.last_decision = decision
+            self.decisions += 1
+        with metrics.time("publish"):
+            for sink in self.sinks:
+                sink(decision, frame)
+            
+    def start(self, source):
+        """Start the source and the inference thread"""
+        if not source.start():
+            return False
+        self.source = source
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+        
+    def stop(self):
+        self.running = False
+        if self.source:
+            self.source.stop()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            
+    def _run(self):
+        """Inference loop: always process the newest frame of the source"""
+        while self.running:
+            item = self.source.acquire()
+            if item is None:
+                if getattr(self.source, "finished", False):
+                    break    # replay ended: nothing more will come
+                continue
+            seq, frame, captured_at = item
+            try:
+                self.process(frame, seq, captured_at)
+            finally:
+                self.source.release()
+                
+    def get_decision(self):
+        with self.lock:
+            return self.last_decision
+            
+    def get_stats(self):
+        """Return pipeline counters: dropped frames, age of the last decision and decision count"""
+        with self.lock:
+            return {
+                "dropped_frames": self.source.dropped if self.source else 0,
+                "frame_age": self.last_decision.frame_age,
+                "decisions": self.decisions,
+                "inferences": self.scheduler.runs if self.scheduler else self.decisions,
+                "skipped": self.scheduler.skips if self.scheduler else 0,
+                "roi_inferences": self.roi_tracker.roi_runs if self.roi_tracker else 0,
+            }
+
+
+def summarize(results):
+    """Per-class max confidence and box over every box of `results`, vectorized
+    
+    Each result's boxes are converted to NumPy once ([x1, y1, x2, y2, (id,) conf, cls]
+    rows). Returns fixed-size arrays: scores (NUM_CLASSES,) and boxes
+    (NUM_CLASSES, 4), with score 0 for absent classes.
+    """
+    scores = np.zeros(NUM_CLASSES, dtype=np.float32)
+    boxes = np.zeros((NUM_CLASSES, 4), dtype=np.float32)
+    
+    arrays = [result.boxes.cpu().numpy().data for result in results
+              if result.boxes is not None and len(result.boxes)]
+    if not arrays:
+        return scores, boxes
+    data = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+    
+    cls = data[:, -1].astype(np.intp)
+    conf = data[:, -2]
+    valid = (cls >= 0) & (cls < NUM_CLASSES)
+    if not valid.all():
+        data, cls, conf = data[valid], cls[valid], conf[valid]
+        if len(cls) == 0:
+            return scores, boxes
+    
+    # Sort by class then confidence: the last row of each class run is its best box
+    order = np.lexsort((conf, cls))
+    sorted_cls = cls[order]
+    last = np.empty(len(order), dtype=bool)
+    last[:-1] = sorted_cls[1:] != sorted_cls[:-1]
+    last[-1] = True
+    best = order[last]
+    
+    scores[cls[best]] = conf[best]
+    boxes[cls[best]] = data[best, :4]
+    return scores, boxes
+
+
+def relabel_book(scores, class_boxes, frame_width):
+    """Keep the most confident book box only, under the class of its position
+    (thirds of the camera image); arrays are modified in place"""
+    books = list(BOOK_CLASSES)
+    best = books[int(np.argmax(scores[books]))]
+    conf = scores[best]
+    box = class_boxes[best].copy()
+    scores[books] = 0.0
+    class_boxes[books] = 0.0
+    if conf > 0:
+        cls_id = book_class_at((box[0] + box[2]) / 2, frame_width)
+        scores[cls_id] = conf
+        class_boxes[cls_id] = box
+
+
+def book_class_at(x, frame_width):
+    """Book class for a box centered at x (camera image, not mirrored)"""
+    if x < frame_width / 3:
+        return 3    # livre_gauche
+    if x > 2 * frame_width / 3:
+        return 1    # livre_droite
+    return 2        # livre_milieu
+
+
+def decide_direction(class_conf):
+    """Direction from the most confident book class (camera image)"""
+    direction = "MILIEU"
+    max_conf = 0.0
+    for cls_id in BOOK_CLASSES:
+        conf = class_conf.get(cls_id, 0.0)
+        if conf > max_conf:
+            max_conf = conf
+            direction = BOOK_DIRECTIONS[cls_id]
+    return direction, max_conf
+
+
+def decide_action(class_conf):
+    """Action from facial expression: accelerate only when smiling beats serious"""
+    sourire_conf = class_conf.get(4, 0.0)
+    serieux_conf = class_conf.get(0, 0.0)
+    if sourire_conf > serieux_conf:
+        return "ACCELERER", sourire_conf
+    return "STOP", serieux_conf
@@ -0,0 +1,142 @@
+"""
+Gaze and eye-openness from facial landmarks, using the YOLO face box as ROI
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .metrics import metrics
+
+LBF_MODEL_PATH = Path(__file__).parent / "assets" / "lbfmodel.yaml"
+LBF_MODEL_URL = "https://raw.githubusercontent.com/kurnianggoro/GSOC2017/master/data/lbfmodel.yaml"
+
+# 68-point landmark indices
+LEFT_EYE = slice(36, 42)
+RIGHT_EYE = slice(42, 48)
+NOSE_TIP = 30
+
+_facemark = None
+_facemark_lock = threading.Lock()
+_facemark_loaded = False
+
+
+def load_facemark(model_path=LBF_MODEL_PATH):
+    """Shared LBF landmark model (loaded once), or None when unavailable"""
+    global _facemark, _facemark_loaded
+    with _facemark_lock:
+        if not _facemark_loaded:
+            _facemark_loaded = True
+            if not hasattr(cv2, "face"):
+                print("Gaze: cv2.face missing (pip install opencv-contrib-python), using eye cascade")
+            elif not Path(model_path).exists():
+                print(f"Gaze: no landmark model at {model_path}, using eye cascade")
+                print(f"      download it from {LBF_MODEL_URL}")
+            else:
+                _facemark = cv2.face.createFacemarkLBF()
+                _facemark.loadModel(str(model_path))
+        return _facemark
+
+
+def face_box(decision):
+    """Most confident face box (serious or smiling) of a decision, or None"""
+    boxes = [(decision.class_conf.get(cls_id, 0.0), decision.boxes[cls_id])
+             for cls_id in (0, 4) if cls_id in decision.boxes]
+    if not boxes:
+        return None
+    return max(boxes)[1]
+
+
+def eye_aspect_ratio(eye):
+    """EAR of 6 eye landmarks: (|p2-p6| + |p3-p5|) / (2 |p1-p4|)"""
+    vertical = np.linalg.norm(eye[1] - eye[5]) + np.linalg.norm(eye[2] - eye[4])
+    horizontal = np.linalg.norm(eye[0] - eye[3])
+    return vertical / (2.0 * horizontal) if horizontal > 0 else 0.0
+
+
+class GazeEngine:
+    """Head direction, eye aspect ratio and drowsiness for one player
+    
+    Landmarks are fitted only inside the YOLO face box, so it is cheap enough
+    for every frame. Without the landmark model, an eye cascade on the upper
+    half of the face box gives a coarse open/closed signal instead.
+    """
+    
+    def __init__(self, ear_threshold=0.21, drowsy_after=0.8):
+        self.ear_threshold = ear_threshold    # below: eyes closed
+        self.drowsy_after = drowsy_after      # seconds of closed eyes before drowsy
+        self.facemark = load_facemark()
+        self.eye_cascade = None
+        if self.facemark is None:
+            self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+        self.ear = 0.0
+        self.closed_since = None
+    
+    def analyze(self, frame, box):
+        """Return (direction, ratio, eyes_open, drowsy) for the face in `box` (x1, y1, x2, y2)"""
+        if box is None:
+            self.closed_since = None
+            return "NO_FACE", 0.5, False, False
+        
+        h, w = frame.shape[:2]
+        x1, y1 = max(0, int(box[0])), max(0, int(box[1]))
+        x2, y2 = min(w, int(box[2])), min(h, int(box[3]))
+        if x2 - x1 < 20 or y2 - y1 < 20:
+            self.closed_since = None
+            return "NO_FACE", 0.5, False, False
+        
+        with metrics.time("gaze"):
+            gray = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+            if self.facemark is not None:
+                direction, ratio, eyes_open = self._landmarks(gray)
+            else:
+                direction, ratio, eyes_open = self._cascade(gray)
+        
+        # Drowsiness: eyes closed for longer than a blink
+        now = time.monotonic()
+        if eyes_open:
+            self.closed_since = None
+        elif self.closed_since is None:
+            self.closed_since = now
+        drowsy = self.closed_since is not None and now - self.closed_since >= self.drowsy_after
+        return direction, ratio, eyes_open, drowsy
+    
+    def _landmarks(self, gray):
+        rect = np.array([[0, 0, gray.shape[1], gray.shape[0]]], dtype=np.int32)
+        with _facemark_lock:
+            ok, landmarks = self.facemark.fit(gray, rect)
+        if not ok:
+            return "DETOURNE", 0.5, False
+        points = landmarks[0][0]
+        
+        self.ear = (eye_aspect_ratio(points[LEFT_EYE]) + eye_aspect_ratio(points[RIGHT_EYE])) / 2
+        eyes_open = self.ear >= self.ear_threshold
+        
+        # Head yaw: nose tip position between the outer eye corners
+        left, right = points[36][0], points[45][0]
+        ratio = float((points[NOSE_TIP][0] - left) / (right - left)) if right > left else 0.5
+        return gaze_direction(ratio), ratio, eyes_open
+    
+    def _cascade(self, gray):
+        upper = gray[:gray.shape[0] // 2]
+        eyes = self.eye_cascade.detectMultiScale(upper, 1.1, 3)
+        if len(eyes) == 0:
+            return "CENTRE", 0.5, False
+        
+        # Average eye position relative to face width
+        centers = [ex + ew / 2 for (ex, ey, ew, eh) in eyes[:2]]
+        ratio = sum(centers) / len(centers) / gray.shape[1]
+        if len(eyes) < 2:
+            ratio = 0.5
+        return gaze_direction(ratio), ratio, True
+
+
+def gaze_direction(ratio):
+    if ratio < 0.35:
+        return "GAUCHE"    # left
+    if ratio > 0.65:
+        return "DROITE"    # right
+    return "CENTRE"        # center
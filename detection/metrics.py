@@ -0,0 +1,111 @@
+"""
+Per-stage pipeline timings
+Each stage keeps its last durations in a ring buffer, percentiles are computed on demand
+"""
+
+import threading
+import time
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Cold start reference: entry points import this module before anything heavy
+STARTED = time.perf_counter()
+
+
+class StageTimer:
+    """Ring buffer of the last `size` durations of one stage (seconds), plus running totals"""
+    
+    def __init__(self, size=1024):
+        self.samples = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.count = 0          # total observations
+        self.total = 0.0        # total seconds
+        self.lock = threading.Lock()
+    
+    def record(self, seconds):
+        with self.lock:
+            self.samples[self.index] = seconds
+            self.index = (self.index + 1) % self.size
+            self.count += 1
+            self.total += seconds
+    
+    def percentiles(self, quantiles=QUANTILES):
+        """Quantiles over the ring buffer, or None before the first observation"""
+        import numpy as np    # only when reading: importing this module stays cheap
+        
+        with self.lock:
+            window = self.samples[:min(self.count, self.size)]
+        if not window:
+            return None
+        return np.quantile(window, quantiles)
+
+
+class _Timing:
+    __slots__ = ("timer", "start")
+    
+    def __init__(self, timer):
+        self.timer = timer
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.timer.record(time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Named stage timers, shared by every component of the process"""
+    
+    def __init__(self, size=1024):
+        self.size = size
+        self.stages = {}
+        self.lock = threading.Lock()
+    
+    def stage(self, name):
+        timer = self.stages.get(name)
+        if timer is None:
+            with self.lock:
+                timer = self.stages.setdefault(name, StageTimer(self.size))
+        return timer
+    
+    def record(self, name, seconds):
+        self.stage(name).record(seconds)
+    
+    def time(self, name):
+        """Context manager timing a block: `with metrics.time("yolo"): ...`"""
+        return _Timing(self.stage(name))
+    
+    def items(self):
+        with self.lock:
+            return sorted(self.stages.items())
+    
+    def summary(self):
+        """{stage: (p50, p95, p99) in ms} for the stages that have observations"""
+        rows = {}
+        for name, timer in self.items():
+            values = timer.percentiles()
+            if values is not None:
+                rows[name] = tuple(v * 1000 for v in values)
+        return rows
+    
+    def prometheus(self, prefix="newdriver"):
+        """Stage timings in the Prometheus text exposition format (summary type)"""
+        metric = f"{prefix}_stage_seconds"
+        lines = [f"# HELP {metric} Duration of each detection pipeline stage",
+                 f"# TYPE {metric} summary"]
+        for name, timer in self.items():
+            values = timer.percentiles()
+            if values is None:
+                continue
+            for quantile, value in zip(QUANTILES, values):
+                lines.append(f'{metric}{{stage="{name}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {timer.total:.6f}')
+            lines.append(f'{metric}_count{{stage="{name}"}} {timer.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+metrics = Metrics()
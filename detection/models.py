@@ -0,0 +1,173 @@
+"""
+Model discovery, export and loading
+"""
+
+import hashlib
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+
+def yolo_class():
+    """ultralytics.YOLO, imported on first use (it pulls in torch: seconds of startup)"""
+    try:
+        from ultralytics import YOLO
+    except ImportError as e:
+        # Raised, not exit(): this runs in loader threads that report the error
+        raise ImportError("ultralytics is not installed") from e
+    return YOLO
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Training output folders, most specific first
+RUNS_PATHS = [
+    PROJECT_ROOT / "training" / "runs" / "detect",
+    PROJECT_ROOT / "scripts" / "runs" / "detect",
+    Path("/Users/leod/Documents/Dev/NewDriver/training/runs/detect"),
+    Path("/Users/leod/Documents/Dev/NewDriver/scripts/runs/detect"),
+]
+
+# Loaded models shared by the whole process: (path, backend) -> model, and select_model results
+_loaded = {}
+_selected = {}
+_load_lock = threading.RLock()
+_hashes = {}
+
+# Inference backends and the package each one needs
+BACKENDS = {
+    "pytorch": "torch",
+    "onnx": "onnxruntime",
+    "onnx-int8": "onnxruntime",
+    "openvino": "openvino",
+}
+
+
+def find_latest_model():
+    """Find the most recently trained model (best.pt, else last.pt) in the registry manifest"""
+    from .registry import registry
+    return registry.latest()
+
+
+def available_backends():
+    """Backends whose runtime package is installed"""
+    return [name for name, package in BACKENDS.items() if importlib.util.find_spec(package)]
+
+
+def file_hash(path):
+    """Short SHA-256 of a weights file, used to tag exported models (cached per mtime and size)"""
+    stat = Path(path).stat()
+    key = (str(path), stat.st_mtime, stat.st_size)
+    if key in _hashes:
+        return _hashes[key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _hashes[key] = digest.hexdigest()[:12]
+    return _hashes[key]
+
+
+def exported_path(model_path, backend, digest=None):
+    """Cache location of an exported model, next to the weights"""
+    model_path = Path(model_path)
+    tag = f"{model_path.stem}.{digest or file_hash(model_path)}"
+    if backend == "onnx":
+        return model_path.with_name(f"{tag}.onnx")
+    if backend == "onnx-int8":
+        return model_path.with_name(f"{tag}.int8.onnx")
+    if backend == "openvino":
+        return model_path.with_name(f"{tag}_openvino_model")
+    return model_path
+
+
+def export_model(model_path, backend):
+    """Export .pt weights to an ONNX / OpenVINO model once and reuse it afterwards"""
+    target = exported_path(model_path, backend)
+    if target.exists():
+        return target
+    if backend == "onnx-int8":
+        raise FileNotFoundError("no INT8 model, run training/quantize.py first")
+    
+    print(f"Exporting {model_path.name} to {backend}...")
+    # Dynamic input shape so one export serves every imgsz
+    exported = yolo_class()(str(model_path)).export(format=backend, dynamic=True, verbose=False)
+    Path(exported).rename(target)
+    
+    from .registry import registry
+    registry.refresh()
+    return target
+
+
+def load_model(model_path, backend="pytorch"):
+    """Load YOLO weights with the requested inference backend, once per process"""
+    key = (str(Path(model_path).resolve()), backend)
+    with _load_lock:
+        if key not in _loaded:
+            model_path = Path(model_path)
+            if backend != "pytorch":
+                model_path = export_model(model_path, backend)
+            _loaded[key] = yolo_class()(str(model_path), task="detect")
+        return _loaded[key]
+
+
+class SharedModel:
+    """One loaded model used by several engines; inference calls are serialized"""
+    
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+
+def measure_latency(model, imgsz, runs=20, shape=(480, 640, 3)):
+    """Median per-frame inference time (ms) on a blank frame"""
+    import numpy as np
+    
+    frame = np.zeros(shape, dtype=np.uint8)
+    for _ in range(3):
+        model(frame, imgsz=imgsz, verbose=False)
+    
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model(frame, imgsz=imgsz, verbose=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times))
+
+
+def select_model(model_path, backend="pytorch", imgsz=320):
+    """Load the model with the given backend, or the fastest one for "auto"
+    
+    Prints per-backend latency so each machine can pick its backend.
+    """
+    key = (str(Path(model_path).resolve()), backend, imgsz)
+    with _load_lock:
+        if key not in _selected:
+            _selected[key] = _select_model(model_path, backend, imgsz)
+        return _selected[key]
+
+
+def _select_model(model_path, backend, imgsz):
+    candidates = available_backends() if backend == "auto" else [backend]
+    
+    best = None
+    for name in candidates:
+        try:
+            model = load_model(model_path, name)
+            latency = measure_latency(model, imgsz)
+        except Exception as e:
+            print(f"  {name:<9} unavailable ({e})")
+            continue
+        print(f"  {name:<9} {latency:6.1f} ms/frame (imgsz={imgsz})")
+        if best is None or latency < best[2]:
+            best = (name, model, latency)
+    
+    if best is None:
+        return None, None
+    print(f"Backend: {best[0]}")
+    return best[0], best[1]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Model registry
+Trained models with their metrics, hash and exported variants, cached in a
+manifest so startup does not walk and stat every training run
+"""
+
+import csv
+import json
+import threading
+from pathlib import Path
+
+from .models import BACKENDS, PROJECT_ROOT, RUNS_PATHS, exported_path, file_hash
+
+MANIFEST_PATH = PROJECT_ROOT / "models.json"
+
+METRIC_COLUMNS = {
+    "metrics/precision(B)": "precision",
+    "metrics/recall(B)": "recall",
+    "metrics/mAP50(B)": "mAP50",
+    "metrics/mAP50-95(B)": "mAP50-95",
+}
+
+
+def find_weights(train_dir):
+    """best.pt, else last.pt of a training run, or None while it has none"""
+    for name in ("best.pt", "last.pt"):
+        weights = train_dir / "weights" / name
+        if weights.exists():
+            return weights
+    return None
+
+
+def read_metrics(train_dir):
+    """Validation metrics of the best epoch (highest mAP50-95) from results.csv"""
+    results = train_dir / "results.csv"
+    if not results.exists():
+        return {}
+    with open(results, newline="") as f:
+        rows = [{key.strip(): value.strip() for key, value in row.items() if key}
+                for row in csv.DictReader(f)]
+    rows = [row for row in rows if row.get("metrics/mAP50-95(B)")]
+    if not rows:
+        return {}
+    best = max(rows, key=lambda row: float(row["metrics/mAP50-95(B)"]))
+    metrics = {name: round(float(best[column]), 4) for column, name in METRIC_COLUMNS.items() if column in best}
+    metrics["epoch"] = int(float(best.get("epoch", 0)))
+    return metrics
+
+
+class ModelRegistry:
+    """Manifest of trained models, rebuilt when a run was added or got new weights"""
+    
+    def __init__(self, manifest_path=MANIFEST_PATH, runs_paths=None):
+        self.manifest_path = Path(manifest_path)
+        self.runs_paths = runs_paths or RUNS_PATHS
+        self.manifest = None
+        self.lock = threading.Lock()
+    
+    def runs_mtimes(self):
+        """One stat per runs folder: a new training run changes its folder mtime"""
+        return {str(path): path.stat().st_mtime for path in self.runs_paths if path.exists()}
+    
+    def is_current(self, manifest):
+        """Whether a manifest can be trusted without a scan
+        
+        Runs folders unchanged (one stat each), newest model unchanged, and no
+        run listed without weights has written some since (a run scanned while
+        still training). Older models are not checked: they no longer change.
+        """
+        if "pending" not in manifest or manifest.get("runs") != self.runs_mtimes():
+            return False
+        for train_dir in manifest["pending"]:
+            if find_weights(Path(train_dir)) is not None:
+                return False
+        if manifest["models"]:
+            newest = manifest["models"][0]
+            try:
+                stat = Path(newest["path"]).stat()
+            except OSError:
+                return False
+            # best.pt rewritten in place by a run still training keeps the folder mtimes
+            if stat.st_mtime != newest["mtime"] or stat.st_size != newest["size"]:
+                return False
+        return True
+    
+    def load(self):
+        """Manifest from disk if still current, else a fresh scan"""
+        with self.lock:
+            if self.manifest is None:
+                manifest = None
+                if self.manifest_path.exists():
+                    try:
+                        with open(self.manifest_path) as f:
+                            manifest = json.load(f)
+                    except (OSError, ValueError):
+                        manifest = None
+                if manifest is None or not self.is_current(manifest):
+                    manifest = self._scan(manifest)
+                self.manifest = manifest
+            return self.manifest
+    
+    def refresh(self):
+        """Rescan the runs folders (after training or exporting)"""
+        with self.lock:
+            self.manifest = self._scan(self.manifest)
+            return self.manifest
+    
+    def _scan(self, previous=None):
+        # Hashes are reused for unchanged weights files
+        known = {entry["path"]: entry for entry in (previous or {}).get("models", [])}
+        models = []
+        pending = []
+        for runs_path in self.runs_paths:
+            if not runs_path.exists():
+                continue
+            for train_dir in runs_path.iterdir():
+                if not (train_dir.is_dir() and train_dir.name.startswith("train")):
+                    continue
+                weights = find_weights(train_dir)
+                if weights is None:
+                    pending.append(str(train_dir))
+                    continue
+                models.append(self._entry(train_dir, weights, known.get(str(weights))))
+        
+        models.sort(key=lambda entry: entry["run_mtime"], reverse=True)
+        manifest = {"runs": self.runs_mtimes(), "pending": pending, "models": models}
+        try:
+            with open(self.manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            print(f"Warning: cannot write {self.manifest_path} ({e})")
+        return manifest
+    
+    def _entry(self, train_dir, weights, previous):
+        stat = weights.stat()
+        if previous and previous["mtime"] == stat.st_mtime and previous["size"] == stat.st_size:
+            digest = previous["hash"]
+        else:
+            digest = file_hash(weights)
+        exports = {}
+        for backend in BACKENDS:
+            if backend == "pytorch":
+                continue
+            target = exported_path(weights, backend, digest)
+            if target.exists():
+                exports[backend] = str(target)
+        return {
+            "path": str(weights),
+            "run": train_dir.name,
+            "run_mtime": train_dir.stat().st_mtime,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "hash": digest,
+            "metrics": read_metrics(train_dir),
+            "exports": exports,
+        }
+    
+    def models(self):
+        return self.load()["models"]
+    
+    def latest(self):
+        """Path of the most recently trained model still on disk, or None"""
+        for entry in self.models():
+            path = Path(entry["path"])
+            if path.exists():
+                return path
+        return None
+
+
+# Process-wide registry
+registry = ModelRegistry()
+
+
+def main():
+    manifest = registry.refresh()
+    print(f"Manifest: {registry.manifest_path}\n")
+    print(f"{'run':<12} {'mAP50':>7} {'mAP50-95':>9} {'hash':<13} {'exports':<24} path")
+    for entry in manifest["models"]:
+        metrics = entry["metrics"]
+        print(f"{entry['run']:<12} {metrics.get('mAP50', 0):>7.3f} {metrics.get('mAP50-95', 0):>9.3f} "
+              f"{entry['hash']:<13} {','.join(entry['exports']) or '-':<24} {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+ROI tracking: run YOLO on a padded crop around the last book and face boxes
+"""
+
+from .classes import BOOK_CLASSES, FACE_CLASSES
+
+
+class RoiTracker:
+    """Keeps the crop covering the last detections and decides when to fall back
+    to a full-frame search (low confidence, nothing tracked, periodic refresh)"""
+    
+    def __init__(self, imgsz=160, pad=0.25, min_conf=0.4, refresh_interval=30, min_size=96):
+        self.imgsz = imgsz                      # YOLO input size for crops
+        self.pad = pad                          # padding, fraction of the crop size
+        self.min_conf = min_conf                # below this the crop result is rejected
+        self.refresh_interval = refresh_interval
+        self.min_size = min_size                # minimum crop side in pixels
+        self.roi = None
+        self.tracked = ()                       # class groups (book, face) found by the last decision
+        self.since_full = 0
+        self.roi_runs = 0
+        self.full_runs = 0
+        
+    def next_roi(self):
+        """Crop (x1, y1, x2, y2) to use for the next inference, or None for a full frame"""
+        if self.roi is None or self.since_full >= self.refresh_interval:
+            return None
+        return self.roi
+        
+    def accept(self, decision):
+        """Whether a decision obtained on the crop is trustworthy: every group
+        tracked so far must still be found, or it may have left the crop"""
+        for group in self.tracked:
+            if max(decision.class_conf.get(cls_id, 0.0) for cls_id in group) < self.min_conf:
+                return False
+        return decision.confidence >= self.min_conf
+        
+    def update(self, decision, frame_shape, used_roi):
+        """Track the boxes of the last decision"""
+        if used_roi:
+            self.roi_runs += 1
+            self.since_full += 1
+        else:
+            self.full_runs += 1
+            self.since_full = 0
+        
+        self.tracked = tuple(group for group in (BOOK_CLASSES, FACE_CLASSES)
+                             if max(decision.class_conf.get(cls_id, 0.0) for cls_id in group) >= self.min_conf)
+        if not decision.boxes:
+            self.roi = None
+            return
+        
+        x1 = min(b[0] for b in decision.boxes.values())
+        y1 = min(b[1] for b in decision.boxes.values())
+        x2 = max(b[2] for b in decision.boxes.values())
+        y2 = max(b[3] for b in decision.boxes.values())
+        
+        # Pad around the union and keep a minimum size
+        pad = self.pad * max(x2 - x1, y2 - y1)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        half_w = max(x2 - x1 + 2 * pad, self.min_size) / 2
+        half_h = max(y2 - y1 + 2 * pad, self.min_size) / 2
+        
+        h, w = frame_shape[:2]
+        roi = (max(0, int(cx - half_w)), max(0, int(cy - half_h)),
+               min(w, int(cx + half_w)), min(h, int(cy + half_h)))
+        
+        # A crop covering most of the frame gains nothing
+        if (roi[2] - roi[0]) * (roi[3] - roi[1]) > 0.7 * w * h:
+            self.roi = None
+        else:
+            self.roi = roi
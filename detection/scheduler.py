@@ -0,0 +1,65 @@
+"""
+Adaptive scheduling of expensive stages (YOLO, eye tracking) from scene motion
+"""
+
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    """Cheap inter-frame change: mean absolute difference of a tiny grayscale thumbnail"""
+    
+    def __init__(self, size=(32, 24)):
+        self.size = size
+        w, h = size
+        self.small = np.empty((h, w, 3), dtype=np.uint8)
+        self.gray = np.empty((h, w), dtype=np.uint8)
+        self.prev = np.empty((h, w), dtype=np.uint8)
+        self.diff = np.empty((h, w), dtype=np.uint8)
+        self.has_prev = False
+        
+    def update(self, frame):
+        """Return the change since the previous frame (0-255, mean absolute difference)"""
+        cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        
+        if not self.has_prev:
+            motion = 255.0    # first frame: always counts as movement
+            self.has_prev = True
+        else:
+            cv2.absdiff(self.gray, self.prev, dst=self.diff)
+            motion = float(self.diff.mean())
+        
+        self.gray, self.prev = self.prev, self.gray
+        return motion
+
+
+class AdaptiveScheduler:
+    """Run a stage on every min_interval frames while the scene moves, and back off
+    exponentially up to max_interval while it is static (periodic refresh)"""
+    
+    def __init__(self, min_interval=1, max_interval=15, threshold=3.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.threshold = threshold
+        self.interval = min_interval
+        self.since_run = 0
+        self.runs = 0
+        self.skips = 0
+        
+    def should_run(self, motion):
+        """Return True when the stage should run on this frame"""
+        self.since_run += 1
+        moving = motion >= self.threshold
+        if moving:
+            self.interval = self.min_interval
+        
+        if self.since_run < self.interval:
+            self.skips += 1
+            return False
+        
+        self.since_run = 0
+        self.runs += 1
+        if not moving:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return True
@@ -0,0 +1,55 @@
+"""
+Temporal smoothing and hysteresis for direction/action decisions
+"""
+
+from .classes import NUM_CLASSES, BOOK_CLASSES
+
+
+class DecisionFilter:
+    """Streaming filter: exponential moving average of per-class confidence,
+    plus enter/exit thresholds so a single flickering detection cannot toggle
+    the direction or the action. Each update is O(1) and allocates nothing."""
+    
+    def __init__(self, window=4, enter=0.45, exit=0.25, margin=0.1):
+        self.alpha = 2.0 / (window + 1)   # EMA with the same center of mass as a window-frame average
+        self.enter = enter                # smoothed confidence needed to switch to a state
+        self.exit = exit                  # below this the current state is dropped
+        self.margin = margin              # lead a challenger needs over the current state
+        self.ema = [0.0] * NUM_CLASSES
+        self.book_class = None            # book class currently steering, None = no book
+        self.accelerating = False
+        
+    def reset(self):
+        for i in range(NUM_CLASSES):
+            self.ema[i] = 0.0
+        self.book_class = None
+        self.accelerating = False
+        
+    def update(self, class_conf):
+        """Feed per-class max confidence of one inference"""
+        ema = self.ema
+        alpha = self.alpha
+        for i in range(NUM_CLASSES):
+            ema[i] += alpha * (class_conf.get(i, 0.0) - ema[i])
+        
+        # Book: keep the current class until it fades or is clearly beaten
+        best = BOOK_CLASSES[0]
+        for cls_id in BOOK_CLASSES:
+            if ema[cls_id] > ema[best]:
+                best = cls_id
+        current = self.book_class
+        if current is not None and ema[current] < self.exit:
+            current = None
+        if ema[best] >= self.enter and (current is None or ema[best] > ema[current] + self.margin):
+            current = best
+        self.book_class = current
+        
+        # Face: smiling (4) against serious (0)
+        smile, serious = ema[4], ema[0]
+        if self.accelerating:
+            if smile < self.exit or serious > smile + self.margin:
+                self.accelerating = False
+        elif smile >= self.enter and smile > serious + self.margin:
+            self.accelerating = True
+        
+        return self.book_class, self.accelerating
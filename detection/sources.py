@@ -0,0 +1,299 @@
+"""
+Frame sources for the detection engine
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+class FrameRing:
+    """Small preallocated ring of frames; the reader always takes the newest one"""
+    
+    def __init__(self, size=3, shape=(480, 640, 3)):
+        # Need one slot being written, one being read and the latest committed one
+        self.size = max(3, size)
+        self.frames = [np.zeros(shape, dtype=np.uint8) for _ in range(self.size)]
+        self.timestamps = [0.0] * self.size
+        self.cond = threading.Condition()
+        self.seq = 0            # sequence number of the latest committed frame
+        self.latest = -1        # slot of the latest committed frame
+        self.writing = -1       # slot currently filled by the capture thread
+        self.reading = -1       # slot currently held by the inference thread
+        self.last_read_seq = 0
+        self.dropped = 0
+        
+    def begin_write(self):
+        """Reserve a free slot and return its buffer"""
+        with self.cond:
+            slot = (self.latest + 1) % self.size
+            while slot == self.reading or slot == self.latest:
+                slot = (slot + 1) % self.size
+            self.writing = slot
+            return self.frames[slot]
+            
+    def commit_write(self, frame, timestamp):
+        """Publish the reserved slot as the newest frame"""
+        with self.cond:
+            slot = self.writing
+            if frame is not self.frames[slot]:
+                # Capture returned a new array (e.g. different resolution): adopt it
+                self.frames[slot] = frame
+            self.timestamps[slot] = timestamp
+            self.latest = slot
+            self.writing = -1
+            self.seq += 1
+            self.cond.notify_all()
+            
+    def acquire(self, timeout=0.5):
+        """Wait for a frame newer than the last one read and hold it until release()"""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.seq > self.last_read_seq, timeout):
+                return None
+            # Every committed frame between two reads was never seen by the reader
+            self.dropped += self.seq - self.last_read_seq - 1
+            self.last_read_seq = self.seq
+            self.reading = self.latest
+            return self.seq, self.frames[self.reading], self.timestamps[self.reading]
+            
+    def release(self):
+        with self.cond:
+            self.reading = -1
+            
+    def peek(self):
+        """Return a mirrored copy of the newest frame (for display)"""
+        with self.cond:
+            if self.latest < 0:
+                return None
+            return cv2.flip(self.frames[self.latest], 1)
+            
+    def wake(self):
+        """Wake up a blocked reader (used on shutdown)"""
+        with self.cond:
+            self.cond.notify_all()
+
+
+class CameraSource:
+    """Webcam source: a capture thread keeps the device drained into a FrameRing
+    
+    With `preview_size` (width, height), the capture thread also produces a
+    small mirrored RGB preview of every frame into a preallocated buffer, so
+    display code never touches the full-size frames.
+    """
+    
+    def __init__(self, device=0, width=640, height=480, fps=30, ring_size=3, preview_size=None):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.ring = FrameRing(size=ring_size, shape=(height, width, 3))
+        self.cap = None
+        self.running = False
+        self.thread = None
+        
+        self.recorder = None
+        self.record_lock = threading.Lock()
+        
+        self.preview_size = preview_size
+        self.preview_lock = threading.Lock()
+        self.preview_seq = 0
+        if preview_size:
+            shape = (preview_size[1], preview_size[0], 3)
+            self._scaled = np.zeros(shape, dtype=np.uint8)
+            self._mirrored = np.zeros(shape, dtype=np.uint8)
+            self.preview = np.zeros(shape, dtype=np.uint8)
+        
+    def start(self):
+        """Open the device and start the capture thread"""
+        self.cap = cv2.VideoCapture(self.device)
+        if not self.cap.isOpened():
+            print(f"Error: cannot open webcam {self.device}")
+            return False
+        
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        return True
+        
+    def stop(self):
+        """Stop the capture thread and release the device"""
+        self.running = False
+        self.ring.wake()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        if self.cap:
+            self.cap.release()
+        self.stop_recording()
+            
+    def _capture_loop(self):
+        """Keep the webcam drained into the frame ring"""
+        while self.running:
+            buffer = self.ring.begin_write()
+            ret, frame = self.cap.read(buffer)
+            if not ret:
+                continue
+            timestamp = time.monotonic()
+            self.ring.commit_write(frame, timestamp)
+            if self.preview_size:
+                self._update_preview(frame)
+            with self.record_lock:
+                if self.recorder:
+                    self.recorder.write(frame, timestamp)
+                    
+    def start_recording(self, path):
+        """Save every captured frame to a FrameRecorder directory"""
+        with self.record_lock:
+            self.recorder = FrameRecorder(path, (self.height, self.width, 3))
+            
+    def stop_recording(self):
+        with self.record_lock:
+            recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.close()
+                
+    def _update_preview(self, frame):
+        """Downscale and mirror once per captured frame, outside the lock"""
+        cv2.resize(frame, self.preview_size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        cv2.flip(self._scaled, 1, dst=self._mirrored)
+        with self.preview_lock:
+            cv2.cvtColor(self._mirrored, cv2.COLOR_BGR2RGB, dst=self.preview)
+            self.preview_seq += 1
+            
+    def copy_preview(self, dst, last_seq):
+        """Copy the RGB preview into `dst` if newer than `last_seq`; return its sequence number"""
+        with self.preview_lock:
+            if self.preview_seq != last_seq:
+                np.copyto(dst, self.preview)
+            return self.preview_seq
+            
+    def acquire(self, timeout=0.5):
+        """Return (seq, frame, timestamp) for the newest unseen frame, or None"""
+        return self.ring.acquire(timeout)
+        
+    def release(self):
+        """Hand the frame returned by acquire() back to the capture thread"""
+        self.ring.release()
+        
+    def peek(self):
+        """Return a mirrored copy of the newest frame"""
+        return self.ring.peek()
+        
+    @property
+    def dropped(self):
+        return self.ring.dropped
+
+
+class FrameRecorder:
+    """Raw uint8 frames appended to `frames.raw`, with shape and timestamps in `index.json`
+    
+    The raw file is memory-mapped back by ReplaySource, so replay needs no decoding.
+    """
+    
+    def __init__(self, path, shape=(480, 640, 3)):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.shape = tuple(shape)
+        self.file = open(self.path / "frames.raw", "wb")
+        self.timestamps = []
+        
+    def write(self, frame, timestamp):
+        if frame.shape != self.shape:
+            frame = cv2.resize(frame, (self.shape[1], self.shape[0]))
+        np.ascontiguousarray(frame).tofile(self.file)
+        self.timestamps.append(timestamp)
+        
+    def close(self):
+        self.file.close()
+        start = self.timestamps[0] if self.timestamps else 0.0
+        index = {
+            "shape": list(self.shape),
+            "count": len(self.timestamps),
+            "timestamps": [round(t - start, 4) for t in self.timestamps],
+        }
+        with open(self.path / "index.json", "w") as f:
+            json.dump(index, f)
+        print(f"Recorded {len(self.timestamps)} frames to {self.path}")
+
+
+class ReplaySource(CameraSource):
+    """Plays a FrameRecorder directory back through the same ring as the camera
+    
+    realtime=True paces frames by their recorded timestamps in a thread, like a
+    live webcam. realtime=False is pull-based: every acquire() returns the next
+    frame immediately, so each frame is processed exactly once (benchmarks).
+    """
+    
+    def __init__(self, path, realtime=True, loop=False, ring_size=3, preview_size=None):
+        self.path = Path(path)
+        with open(self.path / "index.json") as f:
+            index = json.load(f)
+        height, width, _ = index["shape"]
+        self.timestamps = index["timestamps"]
+        self.count = index["count"]
+        duration = self.timestamps[-1] if self.count > 1 else 0
+        fps = round((self.count - 1) / duration) if duration > 0 else 30
+        super().__init__(str(self.path), width, height, fps, ring_size, preview_size)
+        self.realtime = realtime
+        self.loop = loop
+        self.frames = None
+        self.index = 0
+        self.finished = False
+        
+    def start(self):
+        if self.count == 0:
+            print(f"Error: empty recording {self.path}")
+            return False
+        self.frames = np.memmap(self.path / "frames.raw", dtype=np.uint8, mode="r",
+                                shape=(self.count, self.height, self.width, 3))
+        self.index = 0
+        self.finished = False
+        self.running = True
+        if self.realtime:
+            self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self.thread.start()
+        return True
+        
+    def _next_frame(self):
+        """Push the next recorded frame into the ring; False at the end of a non-looping replay"""
+        if self.index >= self.count:
+            if not self.loop:
+                self.finished = True
+                return False
+            self.index = 0
+        frame = self.ring.begin_write()
+        np.copyto(frame, self.frames[self.index])
+        self.index += 1
+        self.ring.commit_write(frame, time.monotonic())
+        if self.preview_size:
+            self._update_preview(frame)
+        return True
+        
+    def _capture_loop(self):
+        """Replay at the recorded pace"""
+        start = time.monotonic()
+        while self.running:
+            if self.index >= self.count:
+                start = time.monotonic()
+            delay = self.timestamps[self.index % self.count] - (time.monotonic() - start)
+            if delay > 0:
+                time.sleep(delay)
+            if not self._next_frame():
+                break
+                
+    def acquire(self, timeout=0.5):
+        """Newest frame (realtime) or the next frame (max speed); None once a replay ended"""
+        if not self.realtime:
+            if not self.running or not self._next_frame():
+                return None
+        elif self.finished:
+            return self.ring.acquire(0)    # last frame if not read yet, no waiting
+        return self.ring.acquire(timeout)
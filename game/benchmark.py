@@ -0,0 +1,70 @@
+"""
+Game loop benchmark for NewDriver
+Runs N simulated frames headless and reports per-frame timings
+"""
+
+import time
+
+import numpy as np
+import pygame
+
+
+def percentiles(samples):
+    """p50 / p95 / p99 / max of a list of milliseconds"""
+    if not samples:
+        return None
+    values = np.asarray(samples)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return p50, p95, p99, values.max()
+
+
+def run_benchmark(game, frames, engine=None, cold_start=None):
+    """Time update, draw and (optionally) inference for `frames` frames; restart on game over
+    
+    `engine` is a DetectionEngine run on a synthetic camera frame every frame,
+    to put the inference cost next to the game loop cost.
+    """
+    timings = {"update": [], "draw": [], "inference": []}
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    restarts = 0
+    
+    start = time.perf_counter()
+    for _ in range(frames):
+        if game.game_over:
+            game.reset_game()
+            restarts += 1
+        
+        t0 = time.perf_counter()
+        game.update()
+        t1 = time.perf_counter()
+        dirty = game.draw()
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        t2 = time.perf_counter()
+        timings["update"].append((t1 - t0) * 1000)
+        timings["draw"].append((t2 - t1) * 1000)
+        
+        if engine is not None:
+            engine.decide(engine.infer(frame))
+            timings["inference"].append((time.perf_counter() - t2) * 1000)
+    elapsed = time.perf_counter() - start
+    
+    print_report(timings, frames, elapsed, restarts, cold_start, game.seed)
+    return timings
+
+
+def print_report(timings, frames, elapsed, restarts=0, cold_start=None, seed=None):
+    if cold_start:
+        print("\nCold start: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in cold_start.items()))
+    print(f"\n{frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} FPS uncapped), "
+          f"{restarts} game over(s), seed {seed}")
+    print(f"{'stage':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for stage, samples in timings.items():
+        stats = percentiles(samples)
+        if stats is None:
+            continue
+        p50, p95, p99, worst = stats
+        print(f"{stage:<10} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {worst:>8.2f}")
@@ -10,6 +10,9 @@ SCREEN_HEIGHT = 800
 CAR_WIDTH = 60
 CAR_HEIGHT = 100
 
+# Webcam preview
+PREVIEW_SIZE = (200, 150)
+
 # Obstacles
 OBSTACLE_WIDTH = 60
 OBSTACLE_HEIGHT = 60
@@ -32,12 +35,3 @@ GRAY = (100, 100, 100)
 DARK_GRAY = (50, 50, 50)
 ORANGE = (255, 165, 0)
 CYAN = (0, 255, 255)
-
-# YOLO class mapping
-CLASS_NAMES = {
-    0: "visage_serieux",   # serious face
-    1: "livre_droite",     # book right
-    2: "livre_milieu",     # book center
-    3: "livre_gauche",     # book left
-    4: "visage_sourire"    # smiling face
-}
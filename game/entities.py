@@ -6,10 +6,60 @@ import pygame
 import random
 from .constants import *
 
+# Sprites are rendered once, after the display exists (convert_alpha needs it)
+_sprites = {}
+
+
+def car_sprite():
+    """Pre-rendered car, 5 px of shadow margin on each side"""
+    if "car" not in _sprites:
+        surface = pygame.Surface((CAR_WIDTH + 10, CAR_HEIGHT + 10), pygame.SRCALPHA)
+        x, y = 5, 0
+        pygame.draw.ellipse(surface, (30, 30, 30), 
+                           (x - 5, y + CAR_HEIGHT - 10, CAR_WIDTH + 10, 20))
+        pygame.draw.rect(surface, BLUE, 
+                        (x, y, CAR_WIDTH, CAR_HEIGHT), border_radius=12)
+        pygame.draw.rect(surface, (40, 80, 200), 
+                        (x + 8, y + 20, CAR_WIDTH - 16, 40), border_radius=8)
+        pygame.draw.rect(surface, (100, 150, 255), 
+                        (x + 10, y + 22, CAR_WIDTH - 20, 15), border_radius=4)
+        pygame.draw.circle(surface, YELLOW, (x + 12, y + 8), 6)
+        pygame.draw.circle(surface, YELLOW, (x + CAR_WIDTH - 12, y + 8), 6)
+        pygame.draw.rect(surface, RED, (x + 5, y + CAR_HEIGHT - 10, 10, 6), border_radius=2)
+        pygame.draw.rect(surface, RED, (x + CAR_WIDTH - 15, y + CAR_HEIGHT - 10, 10, 6), border_radius=2)
+        _sprites["car"] = surface.convert_alpha()
+    return _sprites["car"]
+
+
+def obstacle_sprite(kind):
+    """Pre-rendered obstacle of one type (car, rock or cone)"""
+    if kind not in _sprites:
+        surface = pygame.Surface((OBSTACLE_WIDTH, OBSTACLE_HEIGHT + 30), pygame.SRCALPHA)
+        if kind == "car":
+            pygame.draw.rect(surface, RED, 
+                           (0, 0, OBSTACLE_WIDTH, OBSTACLE_HEIGHT + 30), border_radius=10)
+            pygame.draw.rect(surface, DARK_GRAY, 
+                           (8, 15, OBSTACLE_WIDTH - 16, 25), border_radius=6)
+        elif kind == "rock":
+            pygame.draw.circle(surface, GRAY, 
+                             (OBSTACLE_WIDTH // 2, OBSTACLE_HEIGHT // 2), OBSTACLE_WIDTH // 2)
+            pygame.draw.circle(surface, (80, 80, 80), 
+                             (OBSTACLE_WIDTH // 2 - 5, OBSTACLE_HEIGHT // 2 - 5), 8)
+        else:
+            points = [(OBSTACLE_WIDTH // 2, 0), 
+                     (0, OBSTACLE_HEIGHT), 
+                     (OBSTACLE_WIDTH, OBSTACLE_HEIGHT)]
+            pygame.draw.polygon(surface, ORANGE, points)
+            pygame.draw.polygon(surface, WHITE, points, 2)
+        _sprites[kind] = surface.convert_alpha()
+    return _sprites[kind]
+
 
 class Car:
     """Player car"""
     
+    __slots__ = ("x", "y", "speed", "max_speed", "target_x", "steering_speed", "rect")
+    
     def __init__(self):
         self.x = ROAD_LEFT + ROAD_WIDTH // 2 - CAR_WIDTH // 2
         self.y = SCREEN_HEIGHT - CAR_HEIGHT - 80
@@ -17,7 +67,8 @@ class Car:
         self.max_speed = 12
         self.target_x = self.x
         self.steering_speed = 0.05
-        
+        self.rect = pygame.Rect(self.x, self.y, CAR_WIDTH, CAR_HEIGHT)
+    
     def update(self, direction, action):
         """Update car position and speed based on direction and action"""
         if direction == "GAUCHE":
@@ -26,67 +77,145 @@ class Car:
             self.target_x = ROAD_RIGHT - LANE_WIDTH // 2 - CAR_WIDTH // 2
         else:
             self.target_x = ROAD_LEFT + ROAD_WIDTH // 2 - CAR_WIDTH // 2
-            
+        
         # Smooth movement
         diff = self.target_x - self.x
         self.x += diff * self.steering_speed
         self.x = max(ROAD_LEFT + 10, min(self.x, ROAD_RIGHT - CAR_WIDTH - 10))
+        self.rect.x = int(self.x)
         
         if action == "ACCELERER":
             self.speed = min(self.speed + 0.3, self.max_speed)
         else:
             self.speed = max(self.speed - 0.2, 2)
-            
+    
     def draw(self, screen):
         """Draw the car with shadow, body, roof, windshield, headlights and taillights"""
-        pygame.draw.ellipse(screen, (30, 30, 30), 
-                           (self.x - 5, self.y + CAR_HEIGHT - 10, CAR_WIDTH + 10, 20))
-        pygame.draw.rect(screen, BLUE, 
-                        (self.x, self.y, CAR_WIDTH, CAR_HEIGHT), border_radius=12)
-        pygame.draw.rect(screen, (40, 80, 200), 
-                        (self.x + 8, self.y + 20, CAR_WIDTH - 16, 40), border_radius=8)
-        pygame.draw.rect(screen, (100, 150, 255), 
-                        (self.x + 10, self.y + 22, CAR_WIDTH - 20, 15), border_radius=4)
-        pygame.draw.circle(screen, YELLOW, (int(self.x + 12), int(self.y + 8)), 6)
-        pygame.draw.circle(screen, YELLOW, (int(self.x + CAR_WIDTH - 12), int(self.y + 8)), 6)
-        pygame.draw.rect(screen, RED, (self.x + 5, self.y + CAR_HEIGHT - 10, 10, 6), border_radius=2)
-        pygame.draw.rect(screen, RED, (self.x + CAR_WIDTH - 15, self.y + CAR_HEIGHT - 10, 10, 6), border_radius=2)
-        
+        screen.blit(car_sprite(), (int(self.x) - 5, int(self.y)))
+    
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, CAR_WIDTH, CAR_HEIGHT)
+        return self.rect
 
 
 class Obstacle:
     """Obstacle to avoid"""
     
-    def __init__(self):
-        self.x = random.randint(ROAD_LEFT + 20, ROAD_RIGHT - OBSTACLE_WIDTH - 20)
-        self.y = -OBSTACLE_HEIGHT - random.randint(0, 200)
-        self.type = random.choice(["car", "rock", "cone"])
-        
+    __slots__ = ("x", "y", "type", "rect", "lanes")
+    
+    def __init__(self, rng=random):
+        self.rect = pygame.Rect(0, 0, OBSTACLE_WIDTH, OBSTACLE_HEIGHT)
+        self.reset(rng)
+    
+    def reset(self, rng=random):
+        """Place at a random position above the screen (also used when recycled)"""
+        self.x = rng.randint(ROAD_LEFT + 20, ROAD_RIGHT - OBSTACLE_WIDTH - 20)
+        self.y = -OBSTACLE_HEIGHT - rng.randint(0, 200)
+        self.type = rng.choice(["car", "rock", "cone"])
+        self.rect.x = self.x
+        self.rect.y = self.y
+        self.lanes = lanes_of(self.x, OBSTACLE_WIDTH)
+    
     def update(self, speed):
         """Move the obstacle downward"""
         self.y += speed + 3
-        
+        self.rect.y = int(self.y)
+    
     def draw(self, screen):
         """Draw the obstacle based on its type"""
-        if self.type == "car":
-            pygame.draw.rect(screen, RED, 
-                           (self.x, self.y, OBSTACLE_WIDTH, OBSTACLE_HEIGHT + 30), border_radius=10)
-            pygame.draw.rect(screen, DARK_GRAY, 
-                           (self.x + 8, self.y + 15, OBSTACLE_WIDTH - 16, 25), border_radius=6)
-        elif self.type == "rock":
-            pygame.draw.circle(screen, GRAY, 
-                             (int(self.x + OBSTACLE_WIDTH // 2), int(self.y + OBSTACLE_HEIGHT // 2)), 
-                             OBSTACLE_WIDTH // 2)
-            pygame.draw.circle(screen, (80, 80, 80), 
-                             (int(self.x + OBSTACLE_WIDTH // 2 - 5), int(self.y + OBSTACLE_HEIGHT // 2 - 5)), 8)
-        else:
-            points = [(self.x + OBSTACLE_WIDTH // 2, self.y), 
-                     (self.x, self.y + OBSTACLE_HEIGHT), 
-                     (self.x + OBSTACLE_WIDTH, self.y + OBSTACLE_HEIGHT)]
-            pygame.draw.polygon(screen, ORANGE, points)
-            pygame.draw.polygon(screen, WHITE, points, 2)
-            
+        screen.blit(obstacle_sprite(self.type), (int(self.x), int(self.y)))
+    
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, OBSTACLE_WIDTH, OBSTACLE_HEIGHT)
+        return self.rect
+
+
+def lanes_of(x, width):
+    """Range of lane indices covered by [x, x + width)"""
+    first = max(0, min(LANE_COUNT - 1, int((x - ROAD_LEFT) // LANE_WIDTH)))
+    last = max(0, min(LANE_COUNT - 1, int((x + width - 1 - ROAD_LEFT) // LANE_WIDTH)))
+    return range(first, last + 1)
+
+
+class ObstacleField:
+    """Active obstacles, bucketed by lane, recycled through a pool
+    
+    Obstacles never change lane, so collision only tests the buckets of the
+    lanes under the car. Nothing is allocated per frame once the pool is warm.
+    Positions come from `rng` (a seeded random.Random gives a repeatable run).
+    """
+    
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.active = []
+        self.pool = []
+        self.buckets = [[] for _ in range(LANE_COUNT)]
+    
+    def __len__(self):
+        return len(self.active)
+    
+    def __iter__(self):
+        return iter(self.active)
+    
+    def spawn(self):
+        if self.pool:
+            obstacle = self.pool.pop()
+            obstacle.reset(self.rng)
+        else:
+            obstacle = Obstacle(self.rng)
+        self.active.append(obstacle)
+        for lane in obstacle.lanes:
+            self.buckets[lane].append(obstacle)
+        return obstacle
+    
+    def clear(self):
+        self.pool.extend(self.active)
+        self.active.clear()
+        for bucket in self.buckets:
+            bucket.clear()
+    
+    def update(self, speed):
+        """Move every obstacle, recycle those off screen; return how many were passed"""
+        for bucket in self.buckets:
+            bucket.clear()
+        
+        passed = 0
+        keep = 0
+        active = self.active
+        for obstacle in active:
+            obstacle.update(speed)
+            if obstacle.y > SCREEN_HEIGHT:
+                self.pool.append(obstacle)
+                passed += 1
+                continue
+            active[keep] = obstacle
+            keep += 1
+            for lane in obstacle.lanes:
+                self.buckets[lane].append(obstacle)
+        del active[keep:]
+        return passed
+    
+    def collides(self, rect):
+        """True if an obstacle in the lanes under `rect` overlaps it"""
+        for lane in lanes_of(rect.x, rect.width):
+            for obstacle in self.buckets[lane]:
+                if rect.colliderect(obstacle.rect):
+                    return True
+        return False
+
+
+def advance(world, direction, action, test_mode):
+    """One frame of driving for anything holding car, obstacles, score, distance,
+    spawn_timer, road_offset and game_over (the game, or one split-screen player)"""
+    world.car.update(direction, action)
+    
+    if not test_mode:
+        world.score += 10 * world.obstacles.update(world.car.speed)
+        if world.obstacles.collides(world.car.get_rect()):
+            world.game_over = True
+        
+        world.spawn_timer += 1
+        if world.spawn_timer > max(40, 80 - world.car.speed * 3):
+            world.spawn_timer = 0
+            world.obstacles.spawn()
+    
+    world.distance += world.car.speed
+    world.road_offset = (world.road_offset + world.car.speed) % 60
@@ -4,27 +4,42 @@ NewDriver - Head-controlled car game
 Main entry point
 """
 
-import pygame
-import cv2
+import argparse
+import os
+import random
 import sys
+import threading
+import time
 from pathlib import Path
 
+import pygame
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Only light modules here: ultralytics, cv2 and numpy are imported by the loader thread
+from detection.metrics import STARTED, metrics
+from detection.models import BACKENDS
 from game.constants import *
-from game.entities import Car, Obstacle
-from game.tracker import HeadTracker, find_latest_model
-from game.ui import Button, draw_road, draw_position_indicator, draw_hud, draw_game_over
+from game.entities import Car, ObstacleField, advance
+from game.scripted import ScriptedTracker, save_recording
+from game.ui import (Button, draw_road, draw_position_indicator, draw_hud, draw_game_over,
+                     draw_render_stats, draw_debug_overlay, draw_loading, overlay_surface, RENDER_STATS_RECT)
 
 
 class Game:
     """Main NewDriver game class"""
     
-    def __init__(self):
+    def __init__(self, backend="pytorch", tracker=None, headless=False, fps=60, record=None, source=None,
+                 debug=False, record_frames=None, seed=None):
+        if headless:
+            # No window: SDL renders into a dummy surface
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
         pygame.display.set_caption("NewDriver - Car Game")
         
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.cold_start = {"window": time.perf_counter() - STARTED}
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 28)
@@ -32,36 +47,99 @@ class Game:
         
         self.test_button = Button(SCREEN_WIDTH - 180, 10, 170, 40, "MODE TEST: OFF", GRAY, DARK_GRAY)
         self.test_mode = False
+        self.fps = fps                  # 0: uncapped
+        self.seed = seed                # obstacle RNG seed, None: random
+        self.rng = random.Random(seed)
+        # Nobody to press SPACE: restart on game over, as the benchmark does
+        self.auto_restart = headless or isinstance(tracker, ScriptedTracker)
+        self.debug = debug              # per-stage timing overlay (F3)
+        self.record = record            # path to save the per-frame input
+        self.recording = []
+        
+        self.record_frames = record_frames
         
-        self.model_path = find_latest_model()
-        if not self.model_path:
-            print("Error: no model found!")
-            print("Run training first: python training/train.py")
-            exit(1)
+        self.preview = None
+        self.preview_surface = None
+        self.preview_seq = 0
+        self.load_error = None
+        self.tracker = tracker
+        if tracker is None:
+            # The window is up: import, load and warm up the model in the background
+            threading.Thread(target=self.load_tracker, args=(backend, source), daemon=True).start()
+        else:
+            self.init_preview()
+        self.reset_game()
+        
+    def load_tracker(self, backend, source):
+        """Loader thread: heavy imports, weights load and warm-up inference (select_model)"""
+        try:
+            from game.tracker import HeadTracker, find_latest_model
             
+            self.model_path = find_latest_model()
+            if not self.model_path:
+                self.load_error = "No model found! Run training first: python training/train.py"
+                return
+            tracker = HeadTracker(self.model_path, backend, source)
+            if self.record_frames:
+                tracker.source.start_recording(self.record_frames)
+        except Exception as e:
+            self.load_error = f"Cannot load model: {e}"
+            return
         print(f"Model loaded: {self.model_path}")
         
-        self.tracker = HeadTracker(self.model_path)
-        self.reset_game()
+        self.cold_start["model"] = time.perf_counter() - STARTED
+        print(f"Cold start: window {self.cold_start['window']:.2f}s, model ready {self.cold_start['model']:.2f}s")
+        self.init_preview()
+        self.tracker = tracker
+        
+    def init_preview(self):
+        """Webcam preview: the surface shares memory with the array, refreshed on new frames only"""
+        import numpy as np
+        
+        self.preview = np.zeros((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), dtype=np.uint8)
+        self.preview_surface = pygame.image.frombuffer(self.preview, PREVIEW_SIZE, "RGB")
+        
+    def wait_for_tracker(self):
+        """Loading screen until the loader thread is done; False on error or quit"""
+        while self.tracker is None:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return False
+            if self.load_error:
+                print(f"Error: {self.load_error}")
+                return False
+            draw_loading(self.screen, self.font, self.big_font, "Loading model...",
+                         time.perf_counter() - STARTED)
+            pygame.display.flip()
+            self.clock.tick(30)
+        return True
         
     def reset_game(self):
         """Reset the game state"""
         self.car = Car()
-        self.obstacles = []
+        self.obstacles = ObstacleField(self.rng)
         self.score = 0
         self.distance = 0
         self.game_over = False
         self.spawn_timer = 0
         self.road_offset = 0
         self.manual_direction = None
+        self.input_state = ("MILIEU", "STOP", 0.0, [])
+        self.frozen = None    # game over screen, only the live areas are redrawn
+        self.draw_ms = 0.0
+        self.update_ms = 0.0
         
-    def run(self):
-        """Main game loop"""
+    def run(self, max_frames=None):
+        """Main game loop (max_frames: stop after that many frames)"""
+        if not self.wait_for_tracker():
+            pygame.quit()
+            return
         if not self.tracker.start():
             print("Cannot start webcam")
             return
             
         running = True
+        frames = 0
         while running:
             mouse_pos = pygame.mouse.get_pos()
             self.test_button.update(mouse_pos)
@@ -76,6 +154,9 @@ class Game:
                         running = False
                     elif event.key == pygame.K_t:
                         self.toggle_test_mode()
+                    elif event.key == pygame.K_F3:
+                        self.debug = not self.debug
+                        self.frozen = None
                     elif event.key == pygame.K_LEFT:
                         self.manual_direction = "GAUCHE"
                     elif event.key == pygame.K_RIGHT:
@@ -89,13 +170,36 @@ class Game:
                 if self.test_button.is_clicked(event):
                     self.toggle_test_mode()
                         
+            if self.game_over and self.auto_restart:
+                self.reset_game()
             if not self.game_over:
+                start = time.perf_counter()
                 self.update()
+                elapsed = time.perf_counter() - start
+                self.update_ms = 0.9 * self.update_ms + 0.1 * elapsed * 1000
+                metrics.record("game_update", elapsed)
                 
-            self.draw()
-            self.clock.tick(60)
+            start = time.perf_counter()
+            dirty = self.draw()
+            elapsed = time.perf_counter() - start
+            self.draw_ms = 0.9 * self.draw_ms + 0.1 * elapsed * 1000
+            metrics.record("game_draw", elapsed)
+            if dirty is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+            self.clock.tick(self.fps)
+            
+            frames += 1
+            if max_frames and frames >= max_frames:
+                running = False
+            if getattr(self.tracker, "finished", False):
+                running = False
             
         self.tracker.stop()
+        if self.record:
+            save_recording(self.record, self.recording)
+            print(f"Input recorded: {self.record} ({len(self.recording)} frames)")
         pygame.quit()
         
     def toggle_test_mode(self):
@@ -103,40 +207,27 @@ class Game:
         self.test_mode = not self.test_mode
         self.test_button.is_active = self.test_mode
         self.test_button.text = "MODE TEST: ON" if self.test_mode else "MODE TEST: OFF"
+        self.frozen = None
         if self.test_mode:
             self.obstacles.clear()
         
     def update(self):
         """Update the game state"""
-        direction, action, _, _ = self.tracker.get_state()
+        self.input_state = self.tracker.get_state()
+        direction, action, _, _ = self.input_state
         
         if self.manual_direction:
             direction = self.manual_direction
+        if self.record:
+            self.recording.append((direction, action))
         
-        self.car.update(direction, action)
-        
-        if not self.test_mode:
-            for obstacle in self.obstacles[:]:
-                obstacle.update(self.car.speed)
-                
-                if self.car.get_rect().colliderect(obstacle.get_rect()):
-                    self.game_over = True
-                    
-                if obstacle.y > SCREEN_HEIGHT:
-                    self.obstacles.remove(obstacle)
-                    self.score += 10
-                    
-            self.spawn_timer += 1
-            if self.spawn_timer > max(40, 80 - self.car.speed * 3):
-                self.spawn_timer = 0
-                if len(self.obstacles) < 4:
-                    self.obstacles.append(Obstacle())
-                
-        self.distance += self.car.speed
-        self.road_offset = (self.road_offset + self.car.speed) % 60
+        advance(self, direction, action, self.test_mode)
         
     def draw(self):
-        """Draw all game elements"""
+        """Draw all game elements; returns the dirty rects, or None when the whole screen changed"""
+        if self.frozen is not None:
+            return self.draw_frozen()
+        
         draw_road(self.screen, self.road_offset)
         
         if not self.test_mode:
@@ -146,33 +237,113 @@ class Game:
         self.car.draw(self.screen)
         draw_position_indicator(self.screen, self.car.x, self.small_font)
         
-        direction, action, _, detections = self.tracker.get_state()
+        direction, action, _, detections = self.input_state
         draw_hud(self.screen, self.font, self.small_font, 
                 self.score, self.car.speed, self.distance,
                 direction, action, detections, self.test_mode)
         
         self.test_button.draw(self.screen, self.small_font)
         self.draw_webcam()
+        if self.debug:
+            draw_debug_overlay(self.screen, self.small_font, metrics.summary())
         
         if self.game_over:
             draw_game_over(self.screen, self.font, self.big_font, self.score, self.distance)
+            self.frozen = self.screen.copy()
             
-        pygame.display.flip()
+        draw_render_stats(self.screen, self.small_font, self.draw_ms, self.update_ms)
+        return None
+        
+    def draw_frozen(self):
+        """Game over: the scene is static, only the webcam and the counters change"""
+        webcam_rect = self.draw_webcam()
+        if webcam_rect is not None:
+            self.screen.blit(overlay_surface(), webcam_rect, webcam_rect)
+        
+        self.screen.blit(self.frozen, RENDER_STATS_RECT, RENDER_STATS_RECT)
+        stats_rect = draw_render_stats(self.screen, self.small_font, self.draw_ms, self.update_ms)
+        return [r for r in (webcam_rect, stats_rect) if r is not None]
         
     def draw_webcam(self):
-        """Display the webcam feed"""
-        frame = self.tracker.get_frame()
-        if frame is not None:
-            small = cv2.resize(frame, (200, 150))
-            small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
-            surface = pygame.surfarray.make_surface(small.swapaxes(0, 1))
-            self.screen.blit(surface, (10, SCREEN_HEIGHT - 200))
-            pygame.draw.rect(self.screen, WHITE, (10, SCREEN_HEIGHT - 200, 200, 150), 3)
+        """Display the webcam feed; returns the area drawn"""
+        if self.preview is None:
+            return None
+        self.preview_seq = self.tracker.copy_preview(self.preview, self.preview_seq)
+        if self.preview_seq == 0:
+            return None
+        self.screen.blit(self.preview_surface, (10, SCREEN_HEIGHT - 200))
+        return pygame.draw.rect(self.screen, WHITE, (10, SCREEN_HEIGHT - 200, 200, 150), 3)
 
 
 def main():
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="NewDriver - Head-controlled car game")
+    parser.add_argument("--backend", default="pytorch",
+                        choices=list(BACKENDS) + ["auto"],
+                        help="inference backend (auto picks the fastest on this machine)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window (SDL dummy video driver)")
+    parser.add_argument("--script", nargs="?", const="", default=None, metavar="RECORDING",
+                        help="scripted input instead of the webcam, optionally replaying a recording")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save the per-frame input to PATH (replay with --script PATH)")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="play a recorded session (detection/benchmark.py record) instead of the webcam")
+    parser.add_argument("--record-frames", metavar="DIR",
+                        help="save the webcam frames to DIR")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate cap (0: uncapped)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="stop after this many frames")
+    parser.add_argument("--debug", action="store_true",
+                        help="show per-stage pipeline timings (toggle with F3)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="obstacle and scripted input seed (default: 0 with --script/--benchmark, else random)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="headless, scripted and uncapped: report update/draw timings over --frames")
+    parser.add_argument("--inference", action="store_true",
+                        help="with --benchmark, also time YOLO on a synthetic frame every frame")
+    args = parser.parse_args()
+    
+    tracker = None
+    seed = args.seed
+    if args.script is not None or args.benchmark:
+        # Same seed, same obstacles: runs can be compared
+        if seed is None:
+            seed = 0
+        tracker = ScriptedTracker.from_file(args.script, loop=args.benchmark) if args.script else ScriptedTracker(seed=seed)
+        
+    if args.benchmark:
+        from game.benchmark import run_benchmark
+        
+        game = Game(args.backend, tracker=tracker, headless=True, fps=0, seed=seed)
+        
+        engine = None
+        if args.inference:
+            from detection.engine import DetectionEngine
+            from detection.models import find_latest_model, select_model
+            
+            model_path = find_latest_model()
+            if not model_path:
+                print("Error: no model found! Run training first: python training/train.py")
+                exit(1)
+            _, model = select_model(model_path, args.backend, imgsz=320)
+            engine = DetectionEngine(model, imgsz=320)
+            game.cold_start["model"] = time.perf_counter() - STARTED
+            
+        tracker.start()
+        run_benchmark(game, args.frames or 1000, engine, game.cold_start)
+        pygame.quit()
+        return
+    
+    source = None
+    if args.replay:
+        from detection.sources import ReplaySource
+        
+        source = ReplaySource(args.replay, realtime=True, loop=True, preview_size=PREVIEW_SIZE)
+        
+    game = Game(args.backend, tracker=tracker, headless=args.headless, fps=args.fps, record=args.record,
+                source=source, debug=args.debug, record_frames=args.record_frames, seed=seed)
+    game.run(args.frames)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Split-screen local multiplayer for NewDriver
+One webcam per player, one batched YOLO call per tick for all of them
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pygame
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detection.metrics import STARTED, metrics
+from detection.models import BACKENDS
+from game.constants import *
+from game.entities import Car, ObstacleField, advance
+from game.main import Game
+from game.ui import (draw_road, draw_position_indicator, draw_hud, draw_game_over,
+                     draw_render_stats, draw_debug_overlay, render_text)
+
+
+def viewports(count):
+    """Screen area of each player: a grid of 1 or 2 columns, cells keep the window aspect ratio"""
+    columns = 1 if count == 1 else 2
+    rows = -(-count // columns)
+    cell_w, cell_h = SCREEN_WIDTH // columns, SCREEN_HEIGHT // rows
+    scale = min(cell_w / SCREEN_WIDTH, cell_h / SCREEN_HEIGHT)
+    width, height = int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale)
+    return [pygame.Rect((i % columns) * cell_w + (cell_w - width) // 2,
+                        (i // columns) * cell_h + (cell_h - height) // 2, width, height)
+            for i in range(count)]
+
+
+class Player:
+    """One player's road: the state advance() drives"""
+    
+    def __init__(self, index):
+        self.index = index
+        self.car = Car()
+        self.obstacles = ObstacleField()
+        self.score = 0
+        self.distance = 0
+        self.game_over = False
+        self.spawn_timer = 0
+        self.road_offset = 0
+        self.input_state = ("MILIEU", "STOP", 0.0, [])
+        self.preview_seq = 0
+
+
+class SplitScreenGame(Game):
+    """Game with one road per camera, drawn full size then scaled into its viewport
+    
+    The round ends when every player crashed; SPACE restarts all of them.
+    Arrow keys steer player 1, as in single player.
+    """
+    
+    def __init__(self, devices, backend="pytorch", headless=False, fps=60, debug=False):
+        self.devices = devices
+        self.players = []
+        self.previews = []
+        super().__init__(backend, headless=headless, fps=fps, debug=debug)
+        pygame.display.set_caption(f"NewDriver - {len(devices)} players")
+        
+        self.viewports = viewports(len(devices))
+        self.world = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.cell = pygame.Surface(self.viewports[0].size).convert()
+    
+    def load_tracker(self, backend, source):
+        """Loader thread: one model, one camera and one detection pipeline per player"""
+        try:
+            from game.tracker import MultiTracker, find_latest_model
+            
+            self.model_path = find_latest_model()
+            if not self.model_path:
+                self.load_error = "No model found! Run training first: python training/train.py"
+                return
+            tracker = MultiTracker(self.model_path, backend, self.devices)
+        except Exception as e:
+            self.load_error = f"Cannot load model: {e}"
+            return
+        print(f"Model loaded: {self.model_path} ({len(self.devices)} cameras)")
+        
+        self.cold_start["model"] = time.perf_counter() - STARTED
+        print(f"Cold start: window {self.cold_start['window']:.2f}s, model ready {self.cold_start['model']:.2f}s")
+        self.init_preview()
+        self.tracker = tracker
+    
+    def init_preview(self):
+        """One preview array and surface per camera"""
+        import numpy as np
+        
+        self.previews = []
+        for _ in self.devices:
+            preview = np.zeros((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), dtype=np.uint8)
+            self.previews.append((preview, pygame.image.frombuffer(preview, PREVIEW_SIZE, "RGB")))
+    
+    def reset_game(self):
+        super().reset_game()
+        self.players = [Player(index) for index in range(len(self.devices))]
+    
+    def toggle_test_mode(self):
+        super().toggle_test_mode()
+        if self.test_mode:
+            for player in self.players:
+                player.obstacles.clear()
+    
+    def update(self):
+        """Advance every player still on the road with its own camera's decision"""
+        for player in self.players:
+            if player.game_over:
+                continue
+            player.input_state = self.tracker.get_state(player.index)
+            direction, action, _, _ = player.input_state
+            if player.index == 0 and self.manual_direction:
+                direction = self.manual_direction
+            advance(player, direction, action, self.test_mode)
+        self.game_over = all(player.game_over for player in self.players)
+    
+    def draw(self):
+        """Each road is drawn on the full-size world surface, then scaled into its viewport"""
+        self.screen.fill(BLACK)
+        for player, viewport in zip(self.players, self.viewports):
+            self.draw_player(player)
+            pygame.transform.scale(self.world, viewport.size, self.cell)
+            self.screen.blit(self.cell, viewport)
+            pygame.draw.rect(self.screen, WHITE, viewport, 2)
+        
+        self.test_button.draw(self.screen, self.small_font)
+        if self.debug:
+            draw_debug_overlay(self.screen, self.small_font, metrics.summary())
+        draw_render_stats(self.screen, self.small_font, self.draw_ms, self.update_ms)
+        return None
+    
+    def draw_player(self, player):
+        world = self.world
+        draw_road(world, player.road_offset)
+        if not self.test_mode:
+            for obstacle in player.obstacles:
+                obstacle.draw(world)
+        player.car.draw(world)
+        draw_position_indicator(world, player.car.x, self.small_font)
+        
+        direction, action, _, detections = player.input_state
+        draw_hud(world, self.font, self.small_font,
+                player.score, player.car.speed, player.distance,
+                direction, action, detections, self.test_mode)
+        
+        label = render_text(self.big_font, f"Player {player.index + 1}", WHITE)
+        world.blit(label, (SCREEN_WIDTH // 2 - label.get_width() // 2, 10))
+        
+        if self.previews:
+            preview, surface = self.previews[player.index]
+            player.preview_seq = self.tracker.copy_preview(preview, player.preview_seq, player.index)
+            if player.preview_seq:
+                world.blit(surface, (10, SCREEN_HEIGHT - 200))
+                pygame.draw.rect(world, WHITE, (10, SCREEN_HEIGHT - 200, 200, 150), 3)
+        
+        if player.game_over:
+            draw_game_over(world, self.font, self.big_font, player.score, player.distance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NewDriver - split-screen, one webcam per player")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[0, 1], metavar="DEVICE",
+                        help="webcam device of each player (default: 0 1)")
+    parser.add_argument("--backend", default="pytorch",
+                        choices=list(BACKENDS) + ["auto"],
+                        help="inference backend (auto picks the fastest on this machine)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no window (SDL dummy video driver)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate cap (0: uncapped)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="stop after this many frames")
+    parser.add_argument("--debug", action="store_true",
+                        help="show per-stage pipeline timings (toggle with F3)")
+    args = parser.parse_args()
+    
+    if len(args.cameras) > 4:
+        print("Error: at most 4 players")
+        exit(1)
+    
+    game = SplitScreenGame(args.cameras, args.backend, headless=args.headless, fps=args.fps, debug=args.debug)
+    game.run(args.frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Scripted input for NewDriver
+Drop-in replacement for HeadTracker without webcam or model (headless runs, benchmarks)
+"""
+
+import json
+import random
+
+DIRECTIONS = ["GAUCHE", "MILIEU", "DROITE"]
+
+
+class ScriptedTracker:
+    """Replays a list of (direction, action) steps, one per get_state() call
+    
+    Without a script, a seeded pseudo-random driver is generated: each
+    direction is held for 0.5 to 2 seconds, accelerating most of the time.
+    """
+    
+    def __init__(self, script=None, seed=0, length=3600, loop=True):
+        self.script = script if script is not None else generate_script(seed, length)
+        self.loop = loop
+        self.index = 0
+        self.state = ("MILIEU", "STOP", 0.0, [])
+        self.running = False
+    
+    @classmethod
+    def from_file(cls, path, loop=True):
+        """Replay a recording saved by the game (--record)"""
+        with open(path) as f:
+            return cls([tuple(step) for step in json.load(f)], loop=loop)
+    
+    def start(self):
+        self.running = True
+        return True
+    
+    def stop(self):
+        self.running = False
+    
+    @property
+    def finished(self):
+        return not self.loop and self.index >= len(self.script)
+    
+    def get_state(self):
+        """Return the next scripted state (same tuple as HeadTracker.get_state)"""
+        if self.script and not self.finished:
+            direction, action = self.script[self.index % len(self.script)]
+            self.index += 1
+            self.state = (direction, action, 1.0, [])
+        return self.state
+    
+    def get_stats(self):
+        return {"step": self.index, "length": len(self.script)}
+    
+    def copy_preview(self, dst, last_seq):
+        """No camera: the preview never changes"""
+        return 0
+
+
+def generate_script(seed=0, length=3600, fps=60):
+    """Deterministic pseudo-random driving input"""
+    rng = random.Random(seed)
+    script = []
+    while len(script) < length:
+        direction = rng.choice(DIRECTIONS)
+        action = "ACCELERER" if rng.random() < 0.8 else "STOP"
+        script.extend([(direction, action)] * rng.randint(fps // 2, fps * 2))
+    return script[:length]
+
+
+def save_recording(path, steps):
+    """Save (direction, action) steps for ScriptedTracker.from_file"""
+    with open(path, "w") as f:
+        json.dump([list(step) for step in steps], f)
@@ -3,179 +3,160 @@ Head tracker for NewDriver
 Detects book position and facial expression via YOLO
 """
 
-import cv2
 import threading
-from pathlib import Path
+import time
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("Error: ultralytics is not installed")
-    exit(1)
-
-from .constants import CLASS_NAMES
+from detection.batching import BatchInference
+from detection.engine import DetectionEngine
+from detection.models import find_latest_model, select_model
+from detection.roi import RoiTracker
+from detection.scheduler import AdaptiveScheduler
+from detection.smoothing import DecisionFilter
+from detection.sources import CameraSource
+from game.constants import PREVIEW_SIZE
 
 
 class HeadTracker:
     """Book position and facial expression detector using YOLO"""
     
-    def __init__(self, model_path):
-        self.model = YOLO(str(model_path))
-        self.cap = None
+    def __init__(self, model_path, backend="pytorch", source=None, roi=True):
+        self.backend, self.model = select_model(model_path, backend, imgsz=320)
+        if self.model is None:
+            raise RuntimeError(f"cannot load model with backend '{backend}'")
         self.running = False
         self.current_direction = "MILIEU"
         self.current_action = "STOP"
         self.confidence = 0.0
-        self.frame = None
         self.lock = threading.Lock()
         self.detections = []
         
-        # Invert X controls (mirrored camera)
-        self.invert_x = True
-        
+        # Camera is not mirrored before inference: invert X controls
+        # (or a ReplaySource playing a recorded session)
+        self.source = source or CameraSource(device=0, width=640, height=480, fps=30,
+                                             preview_size=PREVIEW_SIZE)
+        # Skip YOLO on static frames, full rate as soon as the book or face moves
+        self.engine = DetectionEngine(self.model, imgsz=320, conf=0.25, invert_x=True,
+                                      scheduler=AdaptiveScheduler(min_interval=1, max_interval=6),
+                                      roi_tracker=RoiTracker(imgsz=160) if roi else None,
+                                      decision_filter=DecisionFilter(window=4))
+        self.engine.add_sink(self._on_decision)
+    
     def start(self):
-        """Start the webcam capture"""
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            print("Error: cannot open webcam")
-            return False
-        
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-        
-        self.running = True
-        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
-        self.thread.start()
-        return True
-        
+        """Start the webcam capture and the detection thread"""
+        self.running = self.engine.start(self.source)
+        return self.running
+    
     def stop(self):
         """Stop the capture"""
         self.running = False
-        if self.cap:
-            self.cap.release()
-            
-    def _capture_loop(self):
-        """Capture and detection loop"""
-        while self.running:
-            ret, frame = self.cap.read()
-            if not ret:
-                continue
-                
-            results = self.model(frame, conf=0.25, imgsz=320, verbose=False)
-            
-            # Collect all detections by type
-            livre_detections = {}
-            visage_detections = {}
-            detected = []
-            
-            for result in results:
-                for box in result.boxes:
-                    cls_id = int(box.cls[0])
-                    conf = float(box.conf[0])
-                    
-                    detected.append(f"{CLASS_NAMES.get(cls_id, '?')}: {conf:.0%}")
-                    
-                    if cls_id in [1, 2, 3]:
-                        if cls_id not in livre_detections or conf > livre_detections[cls_id]:
-                            livre_detections[cls_id] = conf
-                            
-                    if cls_id in [0, 4]:
-                        if cls_id not in visage_detections or conf > visage_detections[cls_id]:
-                            visage_detections[cls_id] = conf
-            
-            # Determine direction from book position
-            direction = "MILIEU"
-            max_livre_conf = 0.0
-            
-            for cls_id, conf in livre_detections.items():
-                if conf > max_livre_conf:
-                    max_livre_conf = conf
-                    if cls_id == 1:
-                        direction = "DROITE"
-                    elif cls_id == 3:
-                        direction = "GAUCHE"
-                    elif cls_id == 2:
-                        direction = "MILIEU"
-            
-            # Invert X controls for mirrored camera
-            if self.invert_x:
-                if direction == "DROITE":
-                    direction = "GAUCHE"
-                elif direction == "GAUCHE":
-                    direction = "DROITE"
-            
-            # Determine action from facial expression (default STOP)
-            action = "STOP"
-            max_visage_conf = 0.0
-            
-            if 4 in visage_detections:
-                sourire_conf = visage_detections[4]
-                serieux_conf = visage_detections.get(0, 0)
-                
-                if sourire_conf > serieux_conf:
-                    action = "ACCELERER"
-                    max_visage_conf = sourire_conf
-                else:
-                    action = "STOP"
-                    max_visage_conf = serieux_conf
-            elif 0 in visage_detections:
-                action = "STOP"
-                max_visage_conf = visage_detections[0]
-            
-            with self.lock:
-                self.current_direction = direction
-                self.current_action = action
-                self.confidence = max(max_livre_conf, max_visage_conf)
-                self.frame = frame
-                self.detections = detected
-                
+        self.engine.stop()
+    
+    def _on_decision(self, decision, frame):
+        detected = [f"{name}: {conf:.0%}" for name, conf in decision.detections]
+        with self.lock:
+            self.current_direction = decision.direction
+            self.current_action = decision.action
+            self.confidence = decision.confidence
+            self.detections = detected
+    
     def get_state(self):
         """Return the current state"""
         with self.lock:
             return self.current_direction, self.current_action, self.confidence, self.detections
-            
+    
+    def get_stats(self):
+        """Return pipeline counters: dropped frames, age of the last decision and decision count"""
+        return self.engine.get_stats()
+    
     def get_frame(self):
-        """Return the last frame (mirrored for display)"""
-        with self.lock:
-            if self.frame is not None:
-                return cv2.flip(self.frame.copy(), 1)
-            return None
+        """Return the newest frame (mirrored for display)"""
+        return self.source.peek()
+    
+    def copy_preview(self, dst, last_seq):
+        """Copy the mirrored RGB preview into `dst` when it changed; return its sequence number"""
+        return self.source.copy_preview(dst, last_seq)
 
 
-def find_latest_model():
-    """Find the most recently trained model"""
-    runs_path = Path(__file__).parent.parent / "training" / "runs" / "detect"
-    if not runs_path.exists():
-        runs_path = Path("/Users/leod/Documents/Dev/NewDriver/training/runs/detect")
-    
-    if runs_path.exists():
-        train_dirs = sorted(
-            [d for d in runs_path.iterdir() if d.is_dir() and d.name.startswith('train')],
-            key=lambda x: x.stat().st_mtime, reverse=True
-        )
-        for train_dir in train_dirs:
-            best_path = train_dir / "weights" / "best.pt"
-            if best_path.exists():
-                return best_path
-            last_path = train_dir / "weights" / "last.pt"
-            if last_path.exists():
-                return last_path
-    
-    # Fallback: check scripts/runs
-    scripts_runs = Path("/Users/leod/Documents/Dev/NewDriver/scripts/runs/detect")
-    if scripts_runs.exists():
-        train_dirs = sorted(
-            [d for d in scripts_runs.iterdir() if d.is_dir() and d.name.startswith('train')],
-            key=lambda x: x.stat().st_mtime, reverse=True
-        )
-        for train_dir in train_dirs:
-            best_path = train_dir / "weights" / "best.pt"
-            if best_path.exists():
-                return best_path
-            last_path = train_dir / "weights" / "last.pt"
-            if last_path.exists():
-                return last_path
-                
-    return None
+class MultiTracker:
+    """One HeadTracker per camera, all fed to YOLO in a single batched call per tick
+    
+    Each camera keeps its own capture thread; a tick thread takes the newest
+    frame of every camera and runs them through BatchInference. Decisions are
+    published to each player's HeadTracker as with a single camera.
+    
+    ROI crops are off: crops run at a smaller input size, and a rejected
+    crop triggers a second, unbatched full-frame inference. With every
+    frame at the same size, each tick is exactly one model call.
+    """
+    
+    def __init__(self, model_path, backend="pytorch", devices=(0, 1), sources=None, interval=1 / 30):
+        sources = sources or [CameraSource(device=device, width=640, height=480, fps=30,
+                                           preview_size=PREVIEW_SIZE) for device in devices]
+        # select_model is cached: every player shares the same loaded model
+        self.players = [HeadTracker(model_path, backend, source, roi=False) for source in sources]
+        self.backend = self.players[0].backend
+        self.batcher = BatchInference(self.players[0].model, interval=interval, max_batch=len(sources))
+        self.interval = interval
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """Start every camera, then the tick thread"""
+        started = []
+        for player in self.players:
+            if not player.source.start():
+                for source in started:
+                    source.stop()
+                return False
+            started.append(player.source)
+            player.engine.source = player.source    # dropped frame counter
+            player.running = True
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+    
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+        for player in self.players:
+            player.stop()
+    
+    def _run(self):
+        """Each tick: newest frame of every camera, one batch, then hand the frames back"""
+        next_tick = time.perf_counter()
+        while self.running:
+            items = []
+            held = []
+            for player in self.players:
+                item = player.source.acquire(timeout=0)
+                if item is None:
+                    continue
+                seq, frame, captured_at = item
+                items.append((player.engine, frame, seq, captured_at))
+                held.append(player.source)
+            try:
+                if items:
+                    self.batcher.run_batch(items)
+            finally:
+                for source in held:
+                    source.release()
+            
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+    
+    def get_state(self, player=0):
+        return self.players[player].get_state()
+    
+    def get_stats(self):
+        stats = self.batcher.get_stats()
+        stats["players"] = [player.get_stats() for player in self.players]
+        return stats
+    
+    def copy_preview(self, dst, last_seq, player=0):
+        return self.players[player].copy_preview(dst, last_seq)
@@ -2,9 +2,39 @@
 User interface elements
 """
 
+from collections import OrderedDict
+
 import pygame
 from .constants import *
 
+TEXT_CACHE_SIZE = 256
+RENDER_STATS_RECT = pygame.Rect(10, 145, 400, 24)
+
+_text_cache = OrderedDict()    # (text, color, font) -> surface, least recently used first
+_text_stats = {"hits": 0, "misses": 0}
+
+
+def render_text(font, text, color):
+    """font.render with an LRU cache, labels rarely change between frames"""
+    key = (text, color, font)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        _text_stats["hits"] += 1
+        return surface
+    
+    _text_stats["misses"] += 1
+    surface = font.render(text, True, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+
+def text_cache_hit_rate():
+    total = _text_stats["hits"] + _text_stats["misses"]
+    return _text_stats["hits"] / total if total else 0.0
+
 
 class Button:
     """Clickable button"""
@@ -27,7 +57,7 @@ class Button:
         pygame.draw.rect(screen, color, self.rect, border_radius=8)
         pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=8)
         
-        text_surf = font.render(self.text, True, WHITE)
+        text_surf = render_text(font, self.text, WHITE)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
         
@@ -38,21 +68,35 @@ class Button:
         return False
 
 
+_road_surface = None
+
+
+def road_surface():
+    """Road pre-rendered once, one dash period taller than the screen so it can scroll"""
+    global _road_surface
+    if _road_surface is None:
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT + 60))
+        height = surface.get_height()
+        surface.fill((34, 139, 34))
+        
+        pygame.draw.rect(surface, (139, 90, 43), (ROAD_LEFT - 30, 0, 30, height))
+        pygame.draw.rect(surface, (139, 90, 43), (ROAD_RIGHT, 0, 30, height))
+        pygame.draw.rect(surface, DARK_GRAY, (ROAD_LEFT, 0, ROAD_WIDTH, height))
+        
+        for i in range(1, LANE_COUNT):
+            x = ROAD_LEFT + i * LANE_WIDTH
+            for y in range(0, height, 60):
+                pygame.draw.rect(surface, WHITE, (x - 3, y, 6, 35))
+                
+        pygame.draw.rect(surface, WHITE, (ROAD_LEFT - 5, 0, 8, height))
+        pygame.draw.rect(surface, WHITE, (ROAD_RIGHT - 3, 0, 8, height))
+        _road_surface = surface.convert()
+    return _road_surface
+
+
 def draw_road(screen, road_offset):
-    """Draw the road with grass, dirt edges, lanes and border lines"""
-    screen.fill((34, 139, 34))
-    
-    pygame.draw.rect(screen, (139, 90, 43), (ROAD_LEFT - 30, 0, 30, SCREEN_HEIGHT))
-    pygame.draw.rect(screen, (139, 90, 43), (ROAD_RIGHT, 0, 30, SCREEN_HEIGHT))
-    pygame.draw.rect(screen, DARK_GRAY, (ROAD_LEFT, 0, ROAD_WIDTH, SCREEN_HEIGHT))
-    
-    for i in range(1, LANE_COUNT):
-        x = ROAD_LEFT + i * LANE_WIDTH
-        for y in range(-60 + int(road_offset), SCREEN_HEIGHT, 60):
-            pygame.draw.rect(screen, WHITE, (x - 3, y, 6, 35))
-            
-    pygame.draw.rect(screen, WHITE, (ROAD_LEFT - 5, 0, 8, SCREEN_HEIGHT))
-    pygame.draw.rect(screen, WHITE, (ROAD_RIGHT - 3, 0, 8, SCREEN_HEIGHT))
+    """Draw the road with grass, dirt edges, lanes and border lines (one blit)"""
+    screen.blit(road_surface(), (0, int(road_offset) - 60))
 
 
 def draw_position_indicator(screen, car_x, font):
@@ -67,7 +111,7 @@ def draw_position_indicator(screen, car_x, font):
     
     labels = ["GAUCHE", "MILIEU", "DROITE"]
     for i, label in enumerate(labels):
-        text = font.render(label, True, WHITE)
+        text = render_text(font, label, WHITE)
         text_x = indicator_x + i * (indicator_width // 3) + (indicator_width // 6) - text.get_width() // 2
         screen.blit(text, (text_x, indicator_y + 2))
     
@@ -85,12 +129,12 @@ def draw_hud(screen, font, small_font, score, speed, distance, direction, action
     pygame.draw.rect(screen, (0, 0, 0), panel_rect, border_radius=10)
     pygame.draw.rect(screen, WHITE, panel_rect, 2, border_radius=10)
     
-    screen.blit(font.render(f"Score: {score}", True, WHITE), (20, 20))
-    screen.blit(font.render(f"Speed: {int(speed * 10)} km/h", True, WHITE), (20, 50))
-    screen.blit(font.render(f"Distance: {int(distance / 10)}m", True, WHITE), (20, 80))
+    screen.blit(render_text(font, f"Score: {score}", WHITE), (20, 20))
+    screen.blit(render_text(font, f"Speed: {int(speed * 10)} km/h", WHITE), (20, 50))
+    screen.blit(render_text(font, f"Distance: {int(distance / 10)}m", WHITE), (20, 80))
     
     if test_mode:
-        screen.blit(font.render("TEST MODE", True, GREEN), (20, 110))
+        screen.blit(render_text(font, "TEST MODE", GREEN), (20, 110))
     
     # Detection panel
     detect_panel = pygame.Rect(SCREEN_WIDTH - 240, 60, 230, 150)
@@ -98,32 +142,81 @@ def draw_hud(screen, font, small_font, score, speed, distance, direction, action
     pygame.draw.rect(screen, WHITE, detect_panel, 2, border_radius=10)
     
     dir_color = GREEN if direction != "MILIEU" else WHITE
-    screen.blit(font.render(f"Dir: {direction}", True, dir_color), (SCREEN_WIDTH - 230, 70))
+    screen.blit(render_text(font, f"Dir: {direction}", dir_color), (SCREEN_WIDTH - 230, 70))
     
     action_color = GREEN if action == "ACCELERER" else RED
-    screen.blit(font.render(f"Act: {action}", True, action_color), (SCREEN_WIDTH - 230, 100))
+    screen.blit(render_text(font, f"Act: {action}", action_color), (SCREEN_WIDTH - 230, 100))
     
     y_offset = 130
     for det in detections[:3]:
-        screen.blit(small_font.render(det, True, YELLOW), (SCREEN_WIDTH - 230, y_offset))
+        screen.blit(render_text(small_font, det, YELLOW), (SCREEN_WIDTH - 230, y_offset))
         y_offset += 25
 
 
+_overlay = None
+
+
+def overlay_surface():
+    """Translucent full-screen overlay, allocated once"""
+    global _overlay
+    if _overlay is None:
+        # convert() drops the surface alpha: set it on the converted copy
+        _overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        _overlay.fill(BLACK)
+        _overlay.set_alpha(180)
+    return _overlay
+
+
 def draw_game_over(screen, font, big_font, score, distance):
     """Draw the game over overlay"""
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    overlay.fill(BLACK)
-    overlay.set_alpha(180)
-    screen.blit(overlay, (0, 0))
+    screen.blit(overlay_surface(), (0, 0))
     
-    go_text = big_font.render("GAME OVER", True, RED)
+    go_text = render_text(big_font, "GAME OVER", RED)
     screen.blit(go_text, (SCREEN_WIDTH // 2 - go_text.get_width() // 2, SCREEN_HEIGHT // 2 - 80))
     
-    score_text = font.render(f"Final score: {score}", True, WHITE)
+    score_text = render_text(font, f"Final score: {score}", WHITE)
     screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, SCREEN_HEIGHT // 2))
     
-    dist_text = font.render(f"Distance: {int(distance / 10)}m", True, WHITE)
+    dist_text = render_text(font, f"Distance: {int(distance / 10)}m", WHITE)
     screen.blit(dist_text, (SCREEN_WIDTH // 2 - dist_text.get_width() // 2, SCREEN_HEIGHT // 2 + 40))
     
-    restart_text = font.render("SPACE to try again", True, GREEN)
+    restart_text = render_text(font, "SPACE to try again", GREEN)
     screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, SCREEN_HEIGHT // 2 + 100))
+
+
+def draw_loading(screen, font, big_font, message, elapsed):
+    """Loading screen shown while the model loads in the background"""
+    draw_road(screen, int(elapsed * 120) % 60)
+    screen.blit(overlay_surface(), (0, 0))
+    
+    title = render_text(big_font, "NewDriver", WHITE)
+    screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, SCREEN_HEIGHT // 2 - 80))
+    
+    text = render_text(font, f"{message} {elapsed:.0f}s", CYAN)
+    screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 + 10))
+
+
+def draw_render_stats(screen, font, draw_ms, update_ms):
+    """Render-time counters under the stats panel; returns the area drawn"""
+    text = render_text(font, f"Draw {draw_ms:.1f} ms  Update {update_ms:.1f} ms  "
+                             f"Text cache {text_cache_hit_rate():.0%}", CYAN)
+    screen.blit(text, (RENDER_STATS_RECT.x + 5, RENDER_STATS_RECT.y + 2))
+    return RENDER_STATS_RECT
+
+
+def draw_debug_overlay(screen, font, summary):
+    """Per-stage p50/p95/p99 timings (ms) from detection.metrics, toggled with F3"""
+    rows = [("stage", "p50", "p95", "p99")] + [
+        (name, f"{p50:.1f}", f"{p95:.1f}", f"{p99:.1f}") for name, (p50, p95, p99) in summary.items()]
+    panel = pygame.Rect(SCREEN_WIDTH - 330, 220, 320, 12 + 22 * len(rows))
+    pygame.draw.rect(screen, (0, 0, 0), panel, border_radius=10)
+    pygame.draw.rect(screen, CYAN, panel, 2, border_radius=10)
+    
+    for i, row in enumerate(rows):
+        y = panel.y + 8 + i * 22
+        color = CYAN if i == 0 else WHITE
+        screen.blit(render_text(font, row[0], color), (panel.x + 10, y))
+        for j, value in enumerate(row[1:]):
+            text = render_text(font, value, color)
+            screen.blit(text, (panel.x + 170 + j * 50 + 40 - text.get_width(), y))
+    return panel
@@ -0,0 +1,212 @@
+"""
+Decision logic of the detection package: box summary, smoothing, ROI and frame ring
+"""
+
+import numpy as np
+import pytest
+
+from detection.classes import NUM_CLASSES
+from detection.engine import DetectionEngine, relabel_book, summarize
+from detection.roi import RoiTracker
+from detection.smoothing import DecisionFilter
+from detection.sources import FrameRing
+
+
+class FakeBoxes:
+    """Minimal ultralytics Boxes: rows of [x1, y1, x2, y2, conf, cls]"""
+    
+    def __init__(self, rows):
+        self.data = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+    
+    def __len__(self):
+        return len(self.data)
+    
+    def __iter__(self):
+        for row in self.data:
+            yield FakeBox(row)
+    
+    def cpu(self):
+        return self
+    
+    def numpy(self):
+        return self
+
+
+class FakeBox:
+    def __init__(self, row):
+        self.xyxy = np.array([row[:4]])
+        self.conf = np.array([row[4]])
+        self.cls = np.array([row[5]])
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.boxes = FakeBoxes(rows)
+
+
+def loop_summary(results):
+    """The per-box loop summarize() replaced"""
+    class_conf, boxes = {}, {}
+    for result in results:
+        for box in result.boxes:
+            cls_id = int(box.cls[0])
+            conf = float(box.conf[0])
+            if conf > class_conf.get(cls_id, 0.0):
+                class_conf[cls_id] = conf
+                boxes[cls_id] = tuple(box.xyxy[0].tolist())
+    return class_conf, boxes
+
+
+def test_summarize_matches_box_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        results = []
+        for _ in range(rng.integers(1, 3)):
+            count = rng.integers(0, 12)
+            xy = rng.uniform(0, 600, (count, 4))
+            conf = rng.uniform(0.05, 0.99, count)
+            cls = rng.integers(0, NUM_CLASSES, count)
+            results.append(FakeResult(np.column_stack([xy, conf, cls])))
+        
+        scores, boxes = summarize(results)
+        class_conf, class_boxes = loop_summary(results)
+        assert set(np.flatnonzero(scores).tolist()) == set(class_conf)
+        for cls_id, conf in class_conf.items():
+            assert scores[cls_id] == pytest.approx(conf)
+            assert boxes[cls_id] == pytest.approx(class_boxes[cls_id])
+
+
+def test_summarize_empty_and_unknown_classes():
+    scores, boxes = summarize([FakeResult([]), FakeResult([[0, 0, 10, 10, 0.9, 7]])])
+    assert not scores.any()
+    assert not boxes.any()
+
+
+def test_filter_needs_two_frames_to_enter():
+    f = DecisionFilter(window=4)
+    assert f.update({2: 0.9}) == (None, False)
+    assert f.update({2: 0.9}) == (2, False)
+
+
+def test_filter_ignores_a_single_dropout():
+    f = DecisionFilter(window=4)
+    for _ in range(3):
+        f.update({2: 0.9, 4: 0.9})
+    assert f.update({}) == (2, True)
+
+
+def test_filter_switches_on_a_clear_lead_only():
+    f = DecisionFilter(window=4)
+    for _ in range(5):
+        f.update({2: 0.9})
+    # A challenger just above the current class does not take over
+    assert f.update({1: 0.9, 2: 0.85})[0] == 2
+    for _ in range(5):
+        book, _ = f.update({1: 0.9})
+    assert book == 1
+
+
+def test_filter_drops_a_faded_state():
+    f = DecisionFilter(window=4)
+    for _ in range(5):
+        f.update({4: 0.9})
+    states = [f.update({}) for _ in range(5)]
+    assert states[0] == (None, True)
+    assert states[-1] == (None, False)
+
+
+def roi_decision(class_conf, boxes):
+    engine = DetectionEngine(None)
+    decision = engine.decide([])
+    decision.class_conf = class_conf
+    decision.boxes = boxes
+    decision.confidence = max(class_conf.values(), default=0.0)
+    return decision
+
+
+def test_roi_pads_the_union_of_boxes():
+    roi = RoiTracker(pad=0.25, min_size=96)
+    roi.update(roi_decision({2: 0.9, 4: 0.9}, {2: (300, 200, 340, 260), 4: (280, 100, 360, 180)}),
+               (480, 640, 3), used_roi=False)
+    # Union (280, 100, 360, 260), padded by 0.25 * 160 on each side
+    assert roi.next_roi() == (240, 60, 400, 300)
+    assert roi.tracked == ((1, 2, 3), (0, 4))
+
+
+def test_roi_keeps_a_minimum_size_and_drops_large_crops():
+    roi = RoiTracker(pad=0.25, min_size=96)
+    roi.update(roi_decision({4: 0.9}, {4: (300, 200, 310, 210)}), (480, 640, 3), used_roi=False)
+    x1, y1, x2, y2 = roi.next_roi()
+    assert (x2 - x1, y2 - y1) == (96, 96)
+    
+    roi.update(roi_decision({4: 0.9}, {4: (20, 20, 620, 460)}), (480, 640, 3), used_roi=False)
+    assert roi.next_roi() is None
+
+
+def test_roi_rejects_a_crop_that_lost_a_tracked_group():
+    roi = RoiTracker(min_conf=0.4)
+    roi.update(roi_decision({2: 0.9, 4: 0.9}, {2: (300, 200, 340, 260), 4: (280, 100, 360, 180)}),
+               (480, 640, 3), used_roi=False)
+    assert roi.accept(roi_decision({2: 0.8, 4: 0.9}, {}))
+    assert not roi.accept(roi_decision({4: 0.9}, {}))     # book left the crop
+    assert not roi.accept(roi_decision({2: 0.9}, {}))     # face left the crop
+
+
+def test_roi_refreshes_with_a_full_frame():
+    roi = RoiTracker(refresh_interval=2)
+    decision = roi_decision({4: 0.9}, {4: (300, 200, 340, 240)})
+    roi.update(decision, (480, 640, 3), used_roi=False)
+    roi.update(decision, (480, 640, 3), used_roi=True)
+    assert roi.next_roi() is not None
+    roi.update(decision, (480, 640, 3), used_roi=True)
+    assert roi.next_roi() is None
+
+
+@pytest.mark.parametrize("x1, expected", [(20, 3), (300, 2), (560, 1)])
+def test_relabel_book_from_full_frame_position(x1, expected):
+    scores = np.zeros(NUM_CLASSES, dtype=np.float32)
+    boxes = np.zeros((NUM_CLASSES, 4), dtype=np.float32)
+    scores[2], boxes[2] = 0.8, (x1, 0, x1 + 60, 100)
+    scores[1], boxes[1] = 0.3, (0, 0, 10, 10)
+    relabel_book(scores, boxes, 640)
+    assert np.flatnonzero(scores[[1, 2, 3]]).size == 1
+    assert scores[expected] == pytest.approx(0.8)
+    assert tuple(boxes[expected]) == (x1, 0, x1 + 60, 100)
+
+
+def test_decide_on_a_crop_uses_the_full_frame_position():
+    engine = DetectionEngine(None, invert_x=False)
+    # "livre_milieu" inside a crop on the left of the frame
+    decision = engine.decide([FakeResult([[40, 10, 100, 90, 0.9, 2]])], offset=(0, 100), frame_width=640)
+    assert decision.direction == "GAUCHE"
+    assert decision.boxes == {3: (40, 110, 100, 190)}
+
+
+def write(ring, value, timestamp=0.0):
+    frame = ring.begin_write()
+    frame[:] = value
+    ring.commit_write(frame, timestamp)
+
+
+def test_ring_reader_gets_the_newest_frame_and_counts_drops():
+    ring = FrameRing(size=3, shape=(2, 2, 3))
+    for value in (1, 2, 3):
+        write(ring, value, timestamp=value)
+    seq, frame, timestamp = ring.acquire(timeout=0)
+    assert (seq, frame[0, 0, 0], timestamp) == (3, 3, 3)
+    assert ring.dropped == 2
+    ring.release()
+    assert ring.acquire(timeout=0) is None
+
+
+def test_ring_never_overwrites_the_frame_being_read():
+    ring = FrameRing(size=3, shape=(2, 2, 3))
+    write(ring, 1)
+    _, held, _ = ring.acquire(timeout=0)
+    for value in range(2, 20):
+        write(ring, value)
+    assert (held == 1).all()
+    ring.release()
+    seq, frame, _ = ring.acquire(timeout=0)
+    assert (seq, frame[0, 0, 0]) == (19, 19)
+    assert ring.dropped == 17
@@ -0,0 +1,155 @@
+"""
+INT8 post-training quantization of the trained YOLO model
+Calibrates on a sample of Dataset/YOLO_Ready images, writes <best>.<hash>.int8.onnx
+next to the weights and compares mAP and CPU latency against the FP32 model
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detection.classes import CLASS_NAMES
+from detection.models import export_model, exported_path, find_latest_model, load_model, measure_latency
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import (CalibrationDataReader, CalibrationMethod, QuantFormat,
+                                          QuantType, quantize_static)
+except ImportError:
+    print("pip install onnxruntime")
+    exit(1)
+
+current_script_path = os.path.abspath(__file__)
+scripts_dir = os.path.dirname(current_script_path)
+project_root = os.path.dirname(scripts_dir)
+dataset_dir = os.path.join(project_root, "Dataset", "YOLO_Ready")
+yaml_path = os.path.join(dataset_dir, "data.yaml")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def sample_images(count, seed=0):
+    """Random sample of dataset images, taken from the train split when there is one"""
+    images = [p for p in Path(dataset_dir).rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS]
+    train_images = [p for p in images if "train" in p.parts]
+    images = sorted(train_images or images)
+    random.Random(seed).shuffle(images)
+    return images[:count]
+
+
+def letterbox(image, imgsz):
+    """Resize keeping aspect ratio, pad to imgsz x imgsz and convert to a 1x3xHxW float tensor"""
+    h, w = image.shape[:2]
+    scale = imgsz / max(h, w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    resized = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized
+    
+    tensor = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+    return np.ascontiguousarray(tensor[None], dtype=np.float32) / 255.0
+
+
+class ImageCalibrationReader(CalibrationDataReader):
+    """Feeds preprocessed dataset images to the ONNX Runtime calibrator"""
+    
+    def __init__(self, input_name, images, imgsz):
+        self.input_name = input_name
+        self.images = iter(images)
+        self.imgsz = imgsz
+        
+    def get_next(self):
+        for path in self.images:
+            image = cv2.imread(str(path))
+            if image is not None:
+                return {self.input_name: letterbox(image, self.imgsz)}
+        return None
+
+
+def quantize(model_path, imgsz, calib_count):
+    """Export FP32 ONNX (cached) and quantize it to INT8 with static calibration"""
+    fp32_path = export_model(model_path, "onnx")
+    int8_path = exported_path(model_path, "onnx-int8")
+    
+    images = sample_images(calib_count)
+    if not images:
+        print(f"Error: no calibration images found in {dataset_dir}")
+        exit(1)
+    print(f"Calibrating on {len(images)} images (imgsz={imgsz})...")
+    
+    input_name = ort.InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    quantize_static(
+        str(fp32_path), str(int8_path),
+        ImageCalibrationReader(input_name, images, imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    print(f"INT8 model: {int8_path}")
+    return fp32_path, int8_path
+
+
+def evaluate(model_path, backend, imgsz):
+    """mAP on the validation split and median per-frame CPU latency"""
+    model = load_model(model_path, backend)
+    metrics = model.val(data=yaml_path, imgsz=imgsz, batch=1, device="cpu", plots=False, verbose=False)
+    per_class = {CLASS_NAMES[i]: float(metrics.box.maps[i]) for i in CLASS_NAMES if i < len(metrics.box.maps)}
+    return {
+        "map50": float(metrics.box.map50),
+        "map50_95": float(metrics.box.map),
+        "per_class_map50_95": per_class,
+        "latency_ms": measure_latency(model, imgsz),
+    }
+
+
+def print_report(report):
+    fp32, int8 = report["fp32"], report["int8"]
+    print()
+    print(f"{'':<18}{'FP32':>10}{'INT8':>10}{'delta':>10}")
+    for key, label in [("map50", "mAP50"), ("map50_95", "mAP50-95")]:
+        print(f"{label:<18}{fp32[key]:>10.3f}{int8[key]:>10.3f}{int8[key] - fp32[key]:>+10.3f}")
+    for name in CLASS_NAMES.values():
+        a = fp32["per_class_map50_95"].get(name, 0.0)
+        b = int8["per_class_map50_95"].get(name, 0.0)
+        print(f"{name:<18}{a:>10.3f}{b:>10.3f}{b - a:>+10.3f}")
+    speedup = fp32["latency_ms"] / int8["latency_ms"] if int8["latency_ms"] else 0.0
+    print(f"{'latency (ms)':<18}{fp32['latency_ms']:>10.1f}{int8['latency_ms']:>10.1f}{speedup:>9.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="INT8 post-training quantization")
+    parser.add_argument("--model", type=Path, default=None, help="weights to quantize (default: latest best.pt)")
+    parser.add_argument("--imgsz", type=int, default=320, help="calibration and evaluation input size")
+    parser.add_argument("--calib", type=int, default=200, help="number of calibration images")
+    parser.add_argument("--no-report", action="store_true", help="skip the FP32 vs INT8 comparison")
+    args = parser.parse_args()
+    
+    model_path = args.model or find_latest_model()
+    if not model_path:
+        print("Error: no model found! Run training first: python training/train.py")
+        exit(1)
+    
+    fp32_path, int8_path = quantize(Path(model_path), args.imgsz, args.calib)
+    
+    if not args.no_report:
+        report = {
+            "imgsz": args.imgsz,
+            "fp32": evaluate(model_path, "onnx", args.imgsz),
+            "int8": evaluate(model_path, "onnx-int8", args.imgsz),
+        }
+        print_report(report)
+        report_path = int8_path.with_suffix(".json")
+        report_path.write_text(json.dumps(report, indent=2))
+        print(f"\nReport: {report_path}")
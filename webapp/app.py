@@ -4,306 +4,230 @@ NewDriver Web - Flask interface with YOLO detection and eye tracking
 """
 
 from flask import Flask, render_template, Response, jsonify, request
-import cv2
+import argparse
+import json
+import sys
 import threading
 import time
-import numpy as np
+import uuid
 from pathlib import Path
 
-try:
-    from ultralytics import YOLO
-except ImportError:
-    print("pip install ultralytics flask")
-    exit(1)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Only light modules here: sessions (cv2, numpy, ultralytics) is imported by the boot thread
+from detection.metrics import STARTED, metrics
+from detection.models import BACKENDS
 
 app = Flask(__name__)
 
-# YOLO class mapping
-CLASS_NAMES = {
-    0: "visage_serieux",   # serious face
-    1: "livre_droite",     # book right
-    2: "livre_milieu",     # book center
-    3: "livre_gauche",     # book left
-    4: "visage_sourire"    # smiling face
+manager = None          # SessionManager, created by the boot thread
+boot_lock = threading.Lock()
+boot_state = {"status": "idle", "message": ""}
+
+# SessionManager.claim_camera failures
+CAMERA_ERRORS = {
+    "busy": "Webcam in use by another session",
+    "unavailable": "Cannot open the server webcam",
 }
 
 
-class EyeTracker:
-    """Gaze detector based on OpenCV (without MediaPipe)"""
-    
-    def __init__(self):
-        cv2_path = cv2.data.haarcascades
-        self.face_cascade = cv2.CascadeClassifier(cv2_path + 'haarcascade_frontalface_default.xml')
-        self.eye_cascade = cv2.CascadeClassifier(cv2_path + 'haarcascade_eye.xml')
-        
-    def analyze(self, frame):
-        """Analyze gaze direction"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
-        
-        if len(faces) == 0:
-            return "NO_FACE", 0.5, False
-        
-        x, y, w, h = faces[0]
-        roi_gray = gray[y:y+h, x:x+w]
-        eyes = self.eye_cascade.detectMultiScale(roi_gray, 1.1, 3)
-        
-        if len(eyes) < 2:
-            return "DETOURNE", 0.5, False
-        
-        # Average eye position relative to face width
-        eye_centers = []
-        for (ex, ey, ew, eh) in eyes[:2]:
-            eye_center_x = ex + ew // 2
-            eye_centers.append(eye_center_x)
-        
-        avg_eye_x = sum(eye_centers) / len(eye_centers)
-        ratio = avg_eye_x / w
-        
-        if ratio < 0.35:
-            direction = "GAUCHE"    # left
-            looking = False
-        elif ratio > 0.65:
-            direction = "DROITE"   # right
-            looking = False
-        else:
-            direction = "CENTRE"   # center
-            looking = True
-        
-        return direction, ratio, True
-
-
-class GameState:
-    def __init__(self):
-        self.model = None
-        self.cap = None
-        self.running = False
-        self.direction = "MILIEU"   # center
-        self.action = "STOP"
-        self.speed = 0
-        self.score = 0
-        self.car_x = 50
-        self.detections = []
-        self.fps = 0
-        self.game_active = False
-        self.lock = threading.Lock()
-        
-        self.looking_at_screen = True
-        self.eye_direction = "CENTRE"   # center
-        self.gaze_ratio = 0.5
-        self.eyes_open = True
-        self.last_frame = None
-        self.eye_tracker = EyeTracker()
-
-state = GameState()
-
-
-def find_model():
-    paths = [
-        Path("/Users/leod/Documents/Dev/NewDriver/training/runs/detect"),
-        Path("/Users/leod/Documents/Dev/NewDriver/scripts/runs/detect")
-    ]
-    for runs_path in paths:
-        if runs_path.exists():
-            train_dirs = sorted(
-                [d for d in runs_path.iterdir() if d.is_dir() and d.name.startswith('train')],
-                key=lambda x: x.stat().st_mtime, reverse=True
-            )
-            for train_dir in train_dirs:
-                best = train_dir / "weights" / "best.pt"
-                if best.exists():
-                    return best
-    return None
-
-
-def load_model():
-    model_path = find_model()
-    if model_path:
-        state.model = YOLO(str(model_path))
-        print(f"Model loaded: {model_path}")
-        return True
-    return False
-
-
-def detection_loop():
-    state.cap = cv2.VideoCapture(0)
-    state.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
-    state.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
-    state.cap.set(cv2.CAP_PROP_FPS, 30)
-    state.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-    
-    fps_counter = 0
-    last_fps_time = time.time()
-    frame_count = 0
+def boot(backend="pytorch", workers=4, idle_timeout=300, batch_interval=1 / 30):
+    """Start the session manager and load the model in the background (once)"""
+    with boot_lock:
+        if boot_state["status"] != "idle":
+            return
+        boot_state.update(status="loading", message="Starting...")
     
-    # Cached eye tracking results
-    cached_eye_dir = "CENTRE"
-    cached_gaze_ratio = 0.5
-    cached_eyes_open = True
-    
-    while state.running:
-        ret, frame = state.cap.read()
-        if not ret:
-            continue
-        
-        frame = cv2.flip(frame, 1)
-        state.last_frame = frame.copy()
-        frame_count += 1
-            
-        fps_counter += 1
-        if time.time() - last_fps_time >= 1.0:
-            state.fps = fps_counter
-            fps_counter = 0
-            last_fps_time = time.time()
-        
-        # YOLO detection on every frame
-        results = state.model(frame, conf=0.25, imgsz=160, verbose=False)
-        
-        # Eye tracking only every 5 frames (expensive)
-        if frame_count % 5 == 0:
-            cached_eye_dir, cached_gaze_ratio, cached_eyes_open = state.eye_tracker.analyze(frame)
-        
-        # Collect YOLO detections by type
-        livre_det = {}     # book detections
-        visage_det = {}    # face detections
-        detections = []
-        
-        for result in results:
-            for box in result.boxes:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                detections.append({"class": CLASS_NAMES.get(cls_id, "?"), "conf": conf})
-                
-                if cls_id in [1, 2, 3]:    # livre (book) classes
-                    if cls_id not in livre_det or conf > livre_det[cls_id]:
-                        livre_det[cls_id] = conf
-                if cls_id in [0, 4]:        # visage (face) classes
-                    if cls_id not in visage_det or conf > visage_det[cls_id]:
-                        visage_det[cls_id] = conf
-        
-        # Direction based on book position (inverted controls)
-        direction = "MILIEU"   # center
-        max_conf = 0
-        for cls_id, conf in livre_det.items():
-            if conf > max_conf:
-                max_conf = conf
-                if cls_id == 1:    # livre_droite (book right)
-                    direction = "DROITE"
-                elif cls_id == 3:  # livre_gauche (book left)
-                    direction = "GAUCHE"
-                elif cls_id == 2:  # livre_milieu (book center)
-                    direction = "MILIEU"
-        
-        # Action based on face expression and gaze
-        action = "STOP"
-        looking_at_screen = (cached_eye_dir == "CENTRE") and cached_eyes_open
-        
-        if looking_at_screen:
-            if 4 in visage_det:    # visage_sourire (smiling face)
-                if visage_det[4] > visage_det.get(0, 0):
-                    action = "ACCELERER"   # accelerate
-        
-        with state.lock:
-            state.direction = direction
-            state.action = action
-            state.detections = detections
-            state.looking_at_screen = looking_at_screen
-            state.eye_direction = cached_eye_dir
-            state.gaze_ratio = cached_gaze_ratio
-            state.eyes_open = cached_eyes_open
+    def run():
+        global manager
+        try:
+            from sessions import SessionManager
             
-            if state.game_active:
-                if action == "ACCELERER":
-                    state.speed = min(state.speed + 2, 100)
-                else:
-                    state.speed = max(state.speed - 1, 0)
-                
-                target = 50
-                if direction == "GAUCHE":      # left
-                    target = 15
-                elif direction == "DROITE":    # right
-                    target = 85
-                state.car_x += (target - state.car_x) * 0.05
-                
-                state.score += int(state.speed / 20)
-    
-    state.cap.release()
-
-
-def generate_frames():
-    while state.running:
-        if state.last_frame is None:
-            time.sleep(0.03)
-            continue
-        
-        frame = state.last_frame.copy()
-        
-        # Add gaze indicator overlay (no duplicate YOLO inference)
-        with state.lock:
-            color = (0, 255, 0) if state.looking_at_screen else (0, 0, 255)
-            text = f"Gaze: {state.eye_direction}"
-            cv2.putText(frame, text, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+            session_manager = SessionManager(backend, workers, idle_timeout, batch_interval)
+            session_manager.start_reaper()
+            session_manager.start_simulation()
+            manager = session_manager
             
-            eyes_text = "Eyes: OPEN" if state.eyes_open else "Eyes: CLOSED"
-            cv2.putText(frame, eyes_text, (10, 85), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-        
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+            boot_state["message"] = "Loading model..."
+            ready = session_manager.warm_up()
+        except Exception as e:
+            # Any failure must reach /status, or the page waits forever
+            boot_state.update(status="error", message=f"Cannot start: {e}")
+            return
+        if not ready:
+            boot_state.update(status="error", message="Model not found")
+            return
+        seconds = time.perf_counter() - STARTED
+        boot_state.update(status="ready", message="Ready", cold_start=round(seconds, 2))
+        print(f"Cold start: model ready {seconds:.2f}s after launch")
+    threading.Thread(target=run, daemon=True).start()
+
+
+@app.before_request
+def ensure_boot():
+    # Started from __main__ with the CLI options; this covers `flask run`
+    boot()
+
+
+def current_session():
+    """Session of the requesting browser (sid cookie)"""
+    sid = request.cookies.get("sid")
+    if not sid or manager is None:
+        return None
+    return manager.get(sid)
+
+
+def event_stream(session, heartbeat=15):
+    """Server-Sent Events: a delta of the fields that changed, or a heartbeat comment"""
+    sent = {}
+    version = -1
+    while not session.closed:
+        session.touch()
+        version, state = session.wait_state(version, heartbeat)
+        delta = {key: value for key, value in state.items() if sent.get(key) != value}
+        if delta:
+            sent = state
+            yield f"data: {json.dumps(delta, separators=(',', ':'))}\n\n"
+        else:
+            yield ": heartbeat\n\n"
 
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    response = app.make_response(render_template('index.html'))
+    if not request.cookies.get("sid"):
+        response.set_cookie("sid", uuid.uuid4().hex, httponly=True, samesite="Lax")
+    return response
+
+
+@app.route('/status')
+def status():
+    """Boot progress: loading, ready or error"""
+    return jsonify(dict(boot_state, elapsed=round(time.perf_counter() - STARTED, 1)))
 
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    session = current_session()
+    if session is None:
+        return Response(status=204)
+    return Response(session.broadcaster.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
 @app.route('/start', methods=['POST'])
 def start():
-    if not state.running:
-        if load_model():
-            state.running = True
-            state.game_active = True
-            state.score = 0
-            state.speed = 0
-            state.car_x = 50
-            threading.Thread(target=detection_loop, daemon=True).start()
-            return jsonify({"status": "started"})
+    if boot_state["status"] != "ready":
+        return jsonify({"status": "error", "message": boot_state["message"] or "Starting..."})
+    if not manager.load_model():
         return jsonify({"status": "error", "message": "Model not found"})
-    return jsonify({"status": "already running"})
+    session = current_session()
+    if session is None:
+        return jsonify({"status": "error", "message": "No session, reload the page"})
+    if session.running:
+        if not session.sim.game_over:
+            return jsonify({"status": "already running"})
+        session.start()
+        return jsonify({"status": "restarted"})
+    
+    # "browser": frames are uploaded to /frame, "server": the server webcam
+    source = (request.get_json(silent=True) or {}).get("source", "server")
+    if source == "server":
+        claim = manager.claim_camera(session)
+        if claim != "claimed":
+            return jsonify({"status": "error", "message": CAMERA_ERRORS[claim]})
+    session.start()
+    return jsonify({"status": "started", "source": source})
+
+
+@app.route('/test_mode', methods=['POST'])
+def test_mode():
+    """Enable or disable obstacles for the session"""
+    session = current_session()
+    if session is None:
+        return jsonify({"status": "error", "message": "No session"})
+    enabled = bool((request.get_json(silent=True) or {}).get("enabled"))
+    session.sim.set_test_mode(enabled)
+    return jsonify({"status": "ok", "test_mode": enabled})
+
+
+@app.route('/frame', methods=['POST'])
+def upload_frame():
+    """Receive one JPEG frame from the browser camera and queue it for batched inference"""
+    session = current_session()
+    if session is None or not session.running:
+        return jsonify({"status": "error", "message": "Game not started"}), 409
+    
+    import cv2
+    import numpy as np
+    
+    frame = cv2.imdecode(np.frombuffer(request.get_data(), np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return jsonify({"status": "error", "message": "Cannot decode frame"}), 400
+    session.submit(frame)
+    
+    # Latest decision of this session (from a previous batch)
+    controls = session.controls
+    return jsonify({"direction": controls["direction"], "action": controls["action"]})
 
 
 @app.route('/stop', methods=['POST'])
 def stop():
-    state.running = False
-    state.game_active = False
+    session = current_session()
+    if session:
+        manager.stop(session)
     return jsonify({"status": "stopped"})
 
 
+@app.route('/events')
+def events():
+    session = current_session()
+    if session is None:
+        return Response(status=204)
+    return Response(event_stream(session), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.route('/state')
 def get_state():
-    with state.lock:
-        return jsonify({
-            "direction": state.direction,
-            "action": state.action,
-            "speed": state.speed,
-            "score": state.score,
-            "car_x": state.car_x,
-            "fps": state.fps,
-            "detections": state.detections,
-            "game_active": state.game_active,
-            "looking_at_screen": state.looking_at_screen,
-            "eye_direction": state.eye_direction,
-            "eyes_open": state.eyes_open,
-            "gaze_ratio": state.gaze_ratio
-        })
+    session = current_session()
+    if session is None:
+        return jsonify({"status": "error", "message": "No session"})
+    return jsonify(session.snapshot())
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-stage timings and session counters in the Prometheus text format"""
+    lines = [metrics.prometheus().rstrip("\n"),
+             "# TYPE newdriver_sessions gauge",
+             f"newdriver_sessions {len(manager.sessions) if manager else 0}"]
+    if manager is not None and manager.batcher is not None:
+        stats = manager.batcher.get_stats()
+        lines += ["# TYPE newdriver_batches_total counter",
+                  f"newdriver_batches_total {stats['batches']}",
+                  "# TYPE newdriver_batch_size_mean gauge",
+                  f"newdriver_batch_size_mean {stats['mean_batch']:.3f}",
+                  "# TYPE newdriver_batch_dropped_frames_total counter",
+                  f"newdriver_batch_dropped_frames_total {stats['dropped_frames']}"]
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == '__main__':
-    print("NewDriver Web - http://localhost:8080")
+    parser = argparse.ArgumentParser(description="NewDriver Web")
+    parser.add_argument("--backend", default="pytorch",
+                        choices=list(BACKENDS) + ["auto"],
+                        help="inference backend (auto picks the fastest on this machine)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="post-processing worker threads shared by all sessions")
+    parser.add_argument("--idle-timeout", type=int, default=300,
+                        help="seconds before an idle session is evicted")
+    parser.add_argument("--batch-fps", type=float, default=30,
+                        help="batched inference ticks per second for uploaded frames")
+    args = parser.parse_args()
+    
+    boot(args.backend, args.workers, args.idle_timeout, 1 / args.batch_fps)
+    
+    print(f"NewDriver Web - http://localhost:8080 (serving after {time.perf_counter() - STARTED:.2f}s, "
+          "model loading in the background)")
     print("Features: YOLO + Eye Tracking")
     app.run(host='0.0.0.0', port=8080, debug=False, threaded=True)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+NewDriver Web - session load test
+Runs N headless sessions on one SessionManager (shared model, batched
+inference, bounded worker pool), each fed synthetic frames at a target frame
+rate, and reports how many concurrent sessions one process sustains
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detection.metrics import STARTED
+from sessions import SessionManager
+
+
+def synthetic_frames(count=8, shape=(240, 320, 3), seed=0):
+    """Noise frames: every frame counts as motion, so YOLO runs on each one (worst case)"""
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, shape, dtype=np.uint8) for _ in range(count)]
+
+
+def feed(session, frames, fps, duration):
+    """Submit frames to one session at a fixed rate"""
+    period = 1.0 / fps
+    next_time = time.perf_counter()
+    end = next_time + duration
+    i = 0
+    while next_time < end:
+        session.submit(frames[i % len(frames)])
+        i += 1
+        next_time += period
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_level(manager, count, frames, fps, duration):
+    """Run `count` concurrent sessions and return their decision rates"""
+    sessions = [manager.get(manager.new_sid()) for _ in range(count)]
+    for session in sessions:
+        session.start()
+    
+    threads = [threading.Thread(target=feed, args=(s, frames, fps, duration)) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    rates = [s.engine.decisions / duration for s in sessions]
+    for session in sessions:
+        manager.close(session)
+    return rates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="NewDriver Web session load test")
+    parser.add_argument("--backend", default="pytorch", help="inference backend")
+    parser.add_argument("--workers", type=int, default=4, help="post-processing worker threads")
+    parser.add_argument("--fps", type=float, default=15, help="target decisions per second per session")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per load level")
+    parser.add_argument("--max-sessions", type=int, default=32, help="stop ramping at this many sessions")
+    args = parser.parse_args()
+    
+    manager = SessionManager(args.backend, args.workers)
+    if not manager.warm_up():
+        print("Error: no model found! Run training first: python training/train.py")
+        exit(1)
+    manager.start_simulation()
+    print(f"Cold start: model loaded and warmed up {time.perf_counter() - STARTED:.2f}s after launch\n")
+    
+    frames = synthetic_frames()
+    sustained = 0
+    count = 1
+    print(f"{'sessions':>8} {'min fps':>8} {'mean fps':>9} {'total fps':>10}")
+    while count <= args.max_sessions:
+        rates = run_level(manager, count, frames, args.fps, args.duration)
+        print(f"{count:>8} {min(rates):>8.1f} {sum(rates) / len(rates):>9.1f} {sum(rates):>10.1f}")
+        if min(rates) < 0.9 * args.fps:
+            break
+        sustained = count
+        count *= 2
+    
+    stats = manager.batcher.get_stats()
+    print(f"\nSustained: {sustained} concurrent session(s) at {args.fps:g} FPS "
+          f"({args.workers} workers, backend {args.backend}, mean batch {stats['mean_batch']:.1f})")
@@ -0,0 +1,330 @@
+"""
+Per-client game sessions for NewDriver Web
+One model is shared by every session; uploaded frames from all sessions are
+batched into one YOLO call per tick and finished on a bounded worker pool
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from detection.batching import BatchInference
+from detection.engine import DetectionEngine
+from detection.gaze import GazeEngine, face_box
+from detection.metrics import metrics
+from detection.models import SharedModel, find_latest_model, select_model
+from detection.roi import RoiTracker
+from detection.scheduler import AdaptiveScheduler
+from detection.smoothing import DecisionFilter
+from detection.sources import CameraSource
+from simulation import LAYOUT, TICK_RATE, Simulation
+from streaming import FrameBroadcaster
+
+
+def make_engine(model):
+    """Detection engine for one session (per-stream state, shared model)"""
+    # The engine sees the raw camera image and inverts X itself
+    return DetectionEngine(model, imgsz=160, conf=0.25, invert_x=True,
+                           scheduler=AdaptiveScheduler(min_interval=1, max_interval=10),
+                           roi_tracker=RoiTracker(imgsz=128, min_size=64),
+                           decision_filter=DecisionFilter(window=4))
+
+
+class GameState:
+    """Game state of one browser session
+    
+    The decision sink and the simulation tick never share a lock: the sink
+    swaps in a new `controls` dict, the tick reads it, advances the
+    simulation and swaps in a new `state` snapshot that readers use as is.
+    """
+    
+    def __init__(self, sid, model, batcher):
+        self.sid = sid
+        self.batcher = batcher
+        self.engine = make_engine(model)
+        self.engine.add_sink(self.on_decision)
+        self.source = None          # CameraSource while this session owns the server camera
+        self.submitted = 0
+        
+        self.running = False
+        self.game_active = False
+        self.games = 0
+        self.sim = Simulation(seed=sid)
+        self.controls = {
+            "direction": "MILIEU",      # center
+            "action": "STOP",
+            "fps": 0,
+            "detections": [],
+            "looking_at_screen": True,
+            "eye_direction": "CENTRE",  # center
+            "eyes_open": True,
+            "drowsy": False,
+            "gaze_ratio": 0.5,
+        }
+        self.state = {}
+        self.detections_key = []
+        
+        self.last_frame = None
+        self.broadcaster = FrameBroadcaster()
+        self.gaze = GazeEngine()
+        
+        self.fps = 0
+        self.fps_counter = 0
+        self.last_fps_time = time.time()
+        self.last_seen = time.monotonic()
+        self.closed = False
+        
+        # Push stream: version bumped on every state change
+        self.changed = threading.Condition()
+        self.version = 0
+        self.tick()
+    
+    def touch(self):
+        self.last_seen = time.monotonic()
+    
+    def start(self):
+        """Start a new game (also restarts after a game over)"""
+        # Seeded per session and game: a reported game can be replayed
+        self.games += 1
+        self.sim = Simulation(seed=f"{self.sid}-{self.games}", test_mode=self.sim.test_mode)
+        self.running = True
+        self.game_active = True
+        self.broadcaster.open()
+    
+    def start_camera(self):
+        """Drive this session from the server webcam"""
+        self.source = CameraSource(device=0, width=320, height=240, fps=30)
+        if not self.engine.start(self.source):
+            self.source = None
+            return False
+        return True
+    
+    def stop(self):
+        self.running = False
+        self.game_active = False
+        self.broadcaster.close()
+        if self.source:
+            self.engine.stop()
+            self.source = None
+        self.batcher.remove(self.engine)
+    
+    def submit(self, frame, captured_at=None):
+        """Queue an uploaded frame for the next batch (replaces one not yet batched)"""
+        self.submitted += 1
+        self.batcher.submit(self.engine, frame, self.submitted, captured_at)
+    
+    def on_decision(self, decision, frame):
+        """Engine sink: gaze and eye tracking, gaze gating, new controls for the simulation"""
+        # Display and gaze analysis use the mirrored image (and mirrored face box)
+        frame = cv2.flip(frame, 1)
+        self.last_frame = frame
+        box = face_box(decision)
+        if box is not None:
+            width = frame.shape[1]
+            box = (width - box[2], box[1], width - box[0], box[3])
+        
+        self.fps_counter += 1
+        if time.time() - self.last_fps_time >= 1.0:
+            self.fps = self.fps_counter
+            self.fps_counter = 0
+            self.last_fps_time = time.time()
+        
+        # Landmarks inside the YOLO face box: cheap enough for every frame
+        eye_direction, gaze_ratio, eyes_open, drowsy = self.gaze.analyze(frame, box)
+        
+        # Action based on face expression and gaze (a blink is not enough to brake)
+        looking_at_screen = (eye_direction == "CENTRE") and not drowsy
+        action = decision.action if looking_at_screen else "STOP"
+        
+        # Confidence noise below 10% is not a state change: the previous list
+        # (same object, same values) is kept until the coarse key moves
+        previous = self.controls
+        key = [(name, round(conf, 1)) for name, conf in decision.detections]
+        if key == self.detections_key:
+            detections = previous["detections"]
+        else:
+            detections = [{"class": name, "conf": round(conf, 2)} for name, conf in decision.detections]
+            self.detections_key = key
+        
+        # Rounded so sensor noise does not count as a state change
+        self.controls = {
+            "direction": decision.direction,
+            "action": action,
+            "fps": self.fps,
+            "detections": detections,
+            "looking_at_screen": looking_at_screen,
+            "eye_direction": eye_direction,
+            "eyes_open": eyes_open,
+            "drowsy": drowsy,
+            "gaze_ratio": round(gaze_ratio, 2),
+        }
+        
+        self.broadcaster.publish(frame, (eye_direction, eyes_open, looking_at_screen))
+    
+    def tick(self):
+        """One simulation tick: consume the latest controls and publish a snapshot if it changed"""
+        controls = self.controls
+        sim = self.sim
+        if self.game_active:
+            sim.step(controls["direction"], controls["action"])
+        
+        state = dict(controls)
+        state["speed"] = sim.speed
+        state["score"] = sim.score
+        state["car_x"] = round(sim.car_x, 1)
+        state["obstacles"] = sim.obstacle_snapshot()
+        state["game_over"] = sim.game_over
+        state["test_mode"] = sim.test_mode
+        state["game_active"] = self.game_active
+        state["tick_rate"] = TICK_RATE
+        state["layout"] = LAYOUT
+        
+        previous = self.state
+        if any(previous.get(key) != value for key, value in state.items()):
+            state["tick"] = sim.tick
+            self.state = state
+            with self.changed:
+                self.version += 1
+                self.changed.notify_all()
+    
+    def wait_state(self, version, timeout):
+        """Block until the state version differs from `version` (or timeout); return (version, state)"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version or self.closed, timeout)
+            return self.version, self.state
+    
+    def snapshot(self):
+        """Latest published state (immutable once published)"""
+        return self.state
+
+
+class SessionManager:
+    """Sessions keyed by id, sharing one model and a bounded inference pool"""
+    
+    def __init__(self, backend="pytorch", max_workers=4, idle_timeout=300, batch_interval=1 / 30):
+        self.backend = backend
+        self.batch_interval = batch_interval
+        self.idle_timeout = idle_timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self.sessions = {}
+        self.camera_owner = None    # sid of the session using the server webcam
+        self.model = None
+        self.batcher = None
+        self.lock = threading.Lock()
+        self.reaper = None
+        self.simulation = None
+    
+    def warm_up(self):
+        """Load the model and run a dummy inference at every input size, so /start does not wait"""
+        if not self.load_model():
+            return False
+        # ROI crops run at a smaller size than full frames: warm that shape too
+        self.model(np.zeros((128, 128, 3), dtype=np.uint8), imgsz=128, verbose=False)
+        return True
+    
+    def load_model(self):
+        """Load the shared model once (the process-wide model cache is reused across managers)"""
+        with self.lock:
+            if self.model is None:
+                model_path = find_latest_model()
+                if not model_path:
+                    return False
+                backend, model = select_model(model_path, self.backend, imgsz=160)
+                if model is None:
+                    return False
+                self.model = SharedModel(model)
+                self.batcher = BatchInference(self.model, self.batch_interval, executor=self.pool)
+                self.batcher.start()
+                print(f"Model loaded: {model_path} ({backend})")
+            return True
+    
+    def new_sid(self):
+        return uuid.uuid4().hex
+    
+    def get(self, sid, create=True):
+        """Return the session for sid, creating it when needed"""
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is None and create and self.model is not None:
+                session = GameState(sid, self.model, self.batcher)
+                self.sessions[sid] = session
+        if session:
+            session.touch()
+        return session
+    
+    def claim_camera(self, session):
+        """Give the server webcam to a session if nobody else uses it
+        
+        Returns "claimed", "busy" (another session owns it) or "unavailable"
+        (the device cannot be opened).
+        """
+        with self.lock:
+            if self.camera_owner not in (None, session.sid):
+                return "busy"
+            self.camera_owner = session.sid
+        if session.source or session.start_camera():
+            return "claimed"
+        with self.lock:
+            self.camera_owner = None
+        return "unavailable"
+    
+    def stop(self, session):
+        session.stop()
+        with self.lock:
+            if self.camera_owner == session.sid:
+                self.camera_owner = None
+    
+    def close(self, session):
+        """Stop a session and forget it"""
+        with self.lock:
+            self.sessions.pop(session.sid, None)
+        self.stop(session)
+        with session.changed:
+            session.closed = True
+            session.changed.notify_all()
+        
+    def evict_idle(self):
+        """Stop and forget sessions not seen for idle_timeout seconds"""
+        now = time.monotonic()
+        with self.lock:
+            idle = [s for s in self.sessions.values() if now - s.last_seen > self.idle_timeout]
+        for session in idle:
+            self.close(session)
+        return len(idle)
+    
+    def start_reaper(self, interval=30):
+        """Background thread evicting idle sessions"""
+        def reap():
+            while True:
+                time.sleep(interval)
+                evicted = self.evict_idle()
+                if evicted:
+                    print(f"Evicted {evicted} idle session(s)")
+        self.reaper = threading.Thread(target=reap, daemon=True)
+        self.reaper.start()
+    
+    def start_simulation(self):
+        """Background thread ticking every session at TICK_RATE"""
+        def run():
+            interval = 1.0 / TICK_RATE
+            next_tick = time.perf_counter()
+            while True:
+                with self.lock:
+                    sessions = list(self.sessions.values())
+                for session in sessions:
+                    with metrics.time("state_publish"):
+                        session.tick()
+                
+                # Fixed timestep: catch up at most a few ticks after a stall
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -5 * interval:
+                    next_tick = time.perf_counter()
+        self.simulation = threading.Thread(target=run, daemon=True)
+        self.simulation.start()
@@ -0,0 +1,108 @@
+"""
+Fixed-timestep car simulation for NewDriver Web
+Game speed depends only on the tick rate, not on inference FPS
+"""
+
+import random
+
+TICK_RATE = 30    # simulation ticks per second
+
+# Layout in road units: x in [0, 100] across the road, y in [0, 100] down the canvas
+CAR_WIDTH = 13
+CAR_HEIGHT = 12
+CAR_Y = 81                  # top of the car
+OBSTACLE_SIZE = 12
+OBSTACLE_TYPES = ("car", "rock", "cone")
+MAX_OBSTACLES = 3
+SPAWN_INTERVAL = 75         # ticks (2.5 s)
+
+LAYOUT = {
+    "car_width": CAR_WIDTH,
+    "car_height": CAR_HEIGHT,
+    "car_y": CAR_Y,
+    "obstacle_size": OBSTACLE_SIZE,
+}
+
+
+class Obstacle:
+    """Obstacle on the server road"""
+    
+    def __init__(self, obstacle_id, x, kind):
+        self.id = obstacle_id
+        self.x = x              # left edge
+        self.y = -OBSTACLE_SIZE
+        self.type = kind
+
+
+class Simulation:
+    """Car physics, obstacles and collisions of one game, advanced once per tick"""
+    
+    def __init__(self, seed=None, test_mode=False):
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.speed = 0
+        self.score = 0
+        self.car_x = 50.0
+        self.obstacles = []
+        self.next_id = 0
+        self.spawn_timer = 0
+        self.game_over = False
+        self.test_mode = test_mode    # no obstacles
+    
+    def step(self, direction, action):
+        """Advance one tick"""
+        if self.game_over:
+            return
+        
+        if action == "ACCELERER":
+            self.speed = min(self.speed + 2, 100)
+        else:
+            self.speed = max(self.speed - 1, 0)
+        
+        target = 50
+        if direction == "GAUCHE":      # left
+            target = 15
+        elif direction == "DROITE":    # right
+            target = 85
+        self.car_x += (target - self.car_x) * 0.05
+        
+        self.score += int(self.speed / 20)
+        self.tick += 1
+        
+        if not self.test_mode:
+            self.update_obstacles()
+    
+    def update_obstacles(self):
+        """Spawn, move, score and collide obstacles"""
+        self.spawn_timer += 1
+        if self.spawn_timer >= SPAWN_INTERVAL:
+            self.spawn_timer = 0
+            if len(self.obstacles) < MAX_OBSTACLES:
+                x = self.rng.uniform(2, 100 - OBSTACLE_SIZE - 2)
+                self.obstacles.append(Obstacle(self.next_id, x, self.rng.choice(OBSTACLE_TYPES)))
+                self.next_id += 1
+        
+        dy = 0.4 + self.speed * 0.01
+        car_left = self.car_x - CAR_WIDTH / 2
+        car_right = car_left + CAR_WIDTH
+        remaining = []
+        for obstacle in self.obstacles:
+            obstacle.y += dy
+            if obstacle.y > 100:
+                self.score += 10
+                continue
+            remaining.append(obstacle)
+            
+            if (obstacle.x < car_right and obstacle.x + OBSTACLE_SIZE > car_left and
+                    obstacle.y < CAR_Y + CAR_HEIGHT and obstacle.y + OBSTACLE_SIZE > CAR_Y):
+                self.game_over = True
+        self.obstacles = remaining
+    
+    def set_test_mode(self, enabled):
+        self.test_mode = enabled
+        if enabled:
+            self.obstacles = []
+    
+    def obstacle_snapshot(self):
+        """Compact obstacle list for the client: [id, x, y, type]"""
+        return [[o.id, round(o.x, 1), round(o.y, 1), o.type] for o in self.obstacles]
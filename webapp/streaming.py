@@ -0,0 +1,113 @@
+"""
+MJPEG broadcasting for /video_feed
+Each new frame is overlaid and JPEG-encoded once, then shared by every viewer
+"""
+
+import threading
+
+import cv2
+
+from detection.metrics import metrics
+
+
+class FrameBroadcaster:
+    """Encode-once MJPEG fan-out with a condition variable instead of sleep-polling
+    
+    Frames are encoded lazily by the first viewer that needs them, once per
+    quality variant. Viewers that keep missing frames are switched to a
+    half-resolution, lower-quality variant until they catch up.
+    """
+    
+    VARIANTS = {
+        "full": (1.0, 80),    # scale, JPEG quality
+        "low": (0.5, 50),
+    }
+    
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.encode_lock = threading.Lock()
+        self.seq = 0
+        self.frame = None
+        self.overlay = None
+        self.encoded = {}       # variant -> (seq, jpeg bytes)
+        self.closed = False
+        self.encodes = 0
+    
+    def publish(self, frame, overlay):
+        """Hand over a new frame (not modified afterwards) and its overlay info"""
+        with self.cond:
+            self.frame = frame
+            self.overlay = overlay
+            self.seq += 1
+            self.cond.notify_all()
+    
+    def open(self):
+        with self.cond:
+            self.closed = False
+    
+    def close(self):
+        """End every viewer stream"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+    
+    def jpeg(self, variant):
+        """JPEG bytes of the current frame for a variant, encoded at most once per frame"""
+        with self.encode_lock:
+            with self.cond:
+                seq, frame, overlay = self.seq, self.frame, self.overlay
+            cached = self.encoded.get(variant)
+            if cached and cached[0] == seq:
+                return seq, cached[1]
+            
+            scale, quality = self.VARIANTS[variant]
+            with metrics.time("jpeg_encode"):
+                if scale != 1.0:
+                    image = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                else:
+                    image = frame.copy()
+                draw_overlay(image, overlay, scale)
+                _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            data = buffer.tobytes()
+            self.encoded[variant] = (seq, data)
+            self.encodes += 1
+            return seq, data
+    
+    def stream(self, timeout=1.0):
+        """multipart/x-mixed-replace generator for one viewer"""
+        last_seq = 0
+        variant = "full"
+        skipped = 0.0    # moving average of frames missed between two sends
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.seq != last_seq or self.closed, timeout)
+                if self.closed:
+                    return
+                if self.seq == last_seq or self.frame is None:
+                    continue
+                missed = self.seq - last_seq - 1 if last_seq else 0
+            
+            # Adapt to the viewer: the generator only resumes once the previous chunk was written
+            skipped = 0.8 * skipped + 0.2 * missed
+            if variant == "full" and skipped > 1.0:
+                variant = "low"
+            elif variant == "low" and skipped < 0.2:
+                variant = "full"
+            
+            last_seq, data = self.jpeg(variant)
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + data + b'\r\n')
+
+
+def draw_overlay(image, overlay, scale=1.0):
+    """Gaze indicator overlay (no duplicate YOLO inference)"""
+    eye_direction, eyes_open, looking_at_screen = overlay
+    color = (0, 255, 0) if looking_at_screen else (0, 0, 255)
+    size = 0.8 * scale
+    thickness = max(1, int(2 * scale))
+    
+    text = f"Gaze: {eye_direction}"
+    cv2.putText(image, text, (10, int(50 * scale)), cv2.FONT_HERSHEY_SIMPLEX, size, color, thickness)
+    
+    eyes_text = "Eyes: OPEN" if eyes_open else "Eyes: CLOSED"
+    cv2.putText(image, eyes_text, (10, int(85 * scale)), cv2.FONT_HERSHEY_SIMPLEX, size, color, thickness)